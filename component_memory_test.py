@@ -0,0 +1,49 @@
+import gc
+import tracemalloc
+
+from tui.components.component_tree import ComponentTree
+from tui.components.component_style import Style
+from tui.components.examples.button import Button
+from tui.color import RGBA
+
+COLUMNS = 100
+ROWS = 1000
+
+
+def build() -> ComponentTree:
+    """Builds 100 columns of 1000 Buttons each."""
+    tree = ComponentTree()
+    for i in range(COLUMNS):
+        column = f"col{i}"
+        tree.add_component(Button(cid=column,
+                                  style=Style(layout_direction="y")))
+        for j in range(ROWS):
+            tree.add_component(
+                Button(text=f"{j}", cid=f"{column}row{j}",
+                       style=Style(height=1,
+                                   background_color=RGBA(0, 0, j % 256))),
+                column
+            )
+    return tree
+
+
+def main():
+    count = COLUMNS * (ROWS + 1)
+    print(f"tracing {count} Buttons...")
+    gc.collect()
+    tracemalloc.start()
+    tree = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    print(f"retained: {current / 1024 ** 2:.1f} MiB, "
+          f"{current / count:.0f} bytes per component")
+    for stat in snapshot.statistics("lineno")[:8]:
+        print(f"    {stat}")
+    return tree
+
+
+if __name__ == "__main__":
+    main()
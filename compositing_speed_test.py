@@ -0,0 +1,63 @@
+from timeit import timeit
+from blessed import Terminal
+
+from tui.components.component import Component
+from tui.components.component_tree import ComponentTree
+from tui.rendering.renderer import TerminalRenderer
+from tui.components.component_style import Style
+from tui.color import RGBA
+from tui.style_resolver.style_resolver import StyleResolver
+from tui.viewport import Viewport
+
+cont_style = Style(x=0, y=0,
+                   width="100%",
+                   height="100%",
+                   background_color=RGBA(20, 20, 50, 1),
+                   layout_direction="y")
+
+row_style = Style(width="100%",
+                  height=1,
+                  background_color=RGBA(100, 140, 255, 1),
+                  color=RGBA(163, 205, 255, 1))
+
+tree = ComponentTree()
+t = Terminal()
+renderer = TerminalRenderer(t)
+viewport = Viewport(0, 0, 300, 100)
+resolver = StyleResolver(tree, viewport)
+modal = Component(cid="modal", style=Style(position="absolute",
+                                           x=0, y=0,
+                                           width="100%", height="100%",
+                                           background_color=RGBA(0, 0, 0, 0.5)))
+
+
+def layout():
+    tree.add_component(Component(cid="cont", style=cont_style))
+
+    for i in range(100):
+        tree.add_component(
+            Component(text=f"Row {i} " * 40, cid=f"Row{i}", style=row_style),
+            "cont"
+        )
+
+    tree.add_component(modal)
+
+
+def render():
+    """Renders a frame where only the full-screen translucent modal is
+    repainted over the rows beneath it."""
+    modal.style.background_color = RGBA(0, 0, 0, 0.5)
+    resolver.resolve()
+    renderer.render(tree, resolver.damage, dirty=resolver.dirty)
+
+
+def main():
+    layout()
+    resolver.resolve()
+    renderer.render(tree)
+    print("timing...")
+    print(f"{timeit(render, number=100) * 10:.2f} ms per frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+from timeit import timeit
+
+from blessed import Terminal
+
+from tui.components.component import Component
+from tui.components.component_tree import ComponentTree
+from tui.components.component_style import Style
+from tui.color import RGBA
+from tui.rendering.renderer import TerminalRenderer
+from tui.style_resolver.style_resolver import StyleResolver
+from tui.viewport import Viewport
+
+
+def layout() -> ComponentTree:
+    """Builds a column of 10000 rows, of which only the first screenful is
+    in view."""
+    tree = ComponentTree()
+    tree.add_component(Component(cid="log", style=Style(width="100%",
+                                                        height="100%",
+                                                        layout_direction="y")))
+    for i in range(10000):
+        tree.add_component(
+            Component(text=f"line {i}", cid=f"line{i}",
+                      style=Style(width="100%", height=1,
+                                  background_color=RGBA(0, 0, i % 256, 1))),
+            "log"
+        )
+    return tree
+
+
+def time_frames(cull: bool) -> float:
+    """Returns the time in milliseconds it takes to resolve and render a
+    frame after the viewport is resized."""
+    viewport = Viewport(0, 0, 120, 40)
+    resolver = StyleResolver(layout(), viewport, cull=cull)
+    renderer = TerminalRenderer(Terminal())
+    tree = resolver._tree
+
+    def frame():
+        viewport.width = 100 if viewport.width == 120 else 120
+        resolver.resolve()
+        renderer.render(tree, resolver.damage, dirty=resolver.dirty)
+
+    return timeit(frame, number=20) * 1000 / 20
+
+
+def main():
+    print("timing...")
+    for cull in (False, True):
+        print(f"cull={cull}: {time_frames(cull):.2f} ms per frame")
+
+
+if __name__ == "__main__":
+    main()
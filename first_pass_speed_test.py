@@ -0,0 +1,48 @@
+from timeit import timeit
+
+from tui.components.component import Component
+from tui.components.component_tree import ComponentTree
+from tui.components.component_style import Style
+from tui.style_resolver.style_resolver import StyleResolver, _Resolution
+from tui.viewport import Viewport
+
+tree = ComponentTree()
+viewport = Viewport(0, 0, 300, 100)
+resolver = StyleResolver(tree, viewport)
+
+
+def layout():
+    """Builds 20 columns of 100 rows, positioned and sized with percentage
+    and numeric string values."""
+    for i in range(20):
+        tree.add_component(
+            Component(cid=f"col{i}", style=Style(x="5%", y="0",
+                                                 width="5%", height="100%",
+                                                 layout_direction="y"))
+        )
+        for j in range(100):
+            tree.add_component(
+                Component(text=f"Row {j}",
+                          cid=f"col{i}row{j}",
+                          style=Style(x="10%", y="1",
+                                      width="100%", height="1")),
+                f"col{i}"
+            )
+
+
+def first_pass():
+    """Resolves the initial values of every node."""
+    # pylint: disable=protected-access
+    components = set(tree.traverse_components())
+    resolver._first_pass(components, _Resolution(resolver._layouts))
+
+
+def main():
+    layout()
+    resolver.resolve()
+    print("timing...")
+    print(f"{timeit(first_pass, number=100) * 10:.2f} ms per pass")
+
+
+if __name__ == "__main__":
+    main()
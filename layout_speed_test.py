@@ -0,0 +1,72 @@
+from timeit import timeit
+
+from tui.components.component import Component
+from tui.components.component_tree import ComponentTree
+from tui.components.component_style import Style
+from tui.color import RGBA
+from tui.style_resolver.style_resolver import StyleResolver
+from tui.style_resolver.array_style_resolver import ArrayStyleResolver
+from tui.viewport import Viewport
+
+
+def layout() -> ComponentTree:
+    """Builds 100 columns of 100 rows sized relative to the viewport."""
+    tree = ComponentTree()
+    tree.add_component(Component(cid="cont", style=Style(width="100%",
+                                                         height="100%")))
+    for i in range(100):
+        tree.add_component(Component(cid=f"col{i}",
+                                     style=Style(width="1%",
+                                                 height="100%",
+                                                 layout_direction="y")),
+                           "cont")
+        for j in range(100):
+            tree.add_component(
+                Component(text=f"{j}", cid=f"col{i}row{j}",
+                          style=Style(width="100%", height="1%")),
+                f"col{i}"
+            )
+    return tree
+
+
+def time_resizes(resolver_class: type[StyleResolver]) -> float:
+    """Returns the time in milliseconds it takes to resolve the tree after
+    the viewport is resized, which changes every component."""
+    viewport = Viewport(0, 0, 300, 100)
+    resolver = resolver_class(layout(), viewport)
+    resolver.resolve()
+
+    def resize():
+        viewport.width = 600 if viewport.width == 300 else 300
+        viewport.height = 200 if viewport.height == 100 else 100
+        resolver.resolve()
+
+    return timeit(resize, number=20) * 1000 / 20
+
+
+def time_restyles(resolver_class: type[StyleResolver]) -> float:
+    """Returns the time in milliseconds it takes to resolve the tree after
+    the colors of a column change, which leaves the layout as it is."""
+    resolver = resolver_class(layout(), Viewport(0, 0, 300, 100))
+    resolver.resolve()
+    column = resolver._tree.root.children[0].children[0]
+
+    def restyle():
+        for node in column.traverse():
+            style = node.component.style
+            style.background_color = RGBA(255, 0, 0, 1 - style.background_color.a)
+        resolver.resolve()
+
+    return timeit(restyle, number=20) * 1000 / 20
+
+
+def main():
+    print("timing...")
+    for resolver_class in (StyleResolver, ArrayStyleResolver):
+        print(f"{resolver_class.__name__}: "
+              f"{time_resizes(resolver_class):.2f} ms per resize, "
+              f"{time_restyles(resolver_class):.2f} ms per restyle")
+
+
+if __name__ == "__main__":
+    main()
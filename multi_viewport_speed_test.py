@@ -0,0 +1,69 @@
+from random import Random
+from timeit import timeit
+
+from tui.color import RGBA
+from tui.components.component import Component
+from tui.components.component_tree import ComponentTree
+from tui.components.component_style import Style
+from tui.style_resolver.style_resolver import StyleResolver
+from tui.style_resolver.multi_viewport_resolver import MultiViewportResolver
+from tui.viewport import Viewport
+
+SIZES = [(80, 24), (120, 40), (200, 60)]
+SESSIONS = 50
+
+
+def layout() -> ComponentTree:
+    """Builds 20 columns of 50 rows sized relative to the viewport."""
+    tree = ComponentTree()
+    for i in range(20):
+        tree.add_component(Component(cid=f"col{i}",
+                                     style=Style(width="5%",
+                                                 height="100%",
+                                                 layout_direction="y")))
+        for j in range(50):
+            tree.add_component(
+                Component(text=f"{j}", cid=f"col{i}row{j}",
+                          style=Style(width="100%", height="2%")),
+                f"col{i}"
+            )
+    return tree
+
+
+def main():
+    random = Random(0)
+    viewports = [Viewport(0, 0, *random.choice(SIZES))
+                 for _ in range(SESSIONS)]
+
+    tree = layout()
+    viewport = Viewport(0, 0, 0, 0)
+    single = StyleResolver(tree, viewport)
+    multi = MultiViewportResolver(tree)
+    components = [node.component for node in tree.traverse()]
+
+    def change():
+        component = random.choice(components)
+        component.style.width = random.choice(["5%", "10%", "100%"])
+        component.style.background_color = RGBA(0, 0, 0, random.random())
+
+    def resolve_single():
+        # One resolver whose viewport is set to each session's size in turn.
+        change()
+        for session in viewports:
+            viewport.width, viewport.height = session.width, session.height
+            single.resolve()
+
+    def resolve_multi():
+        change()
+        for session in viewports:
+            multi.resolve(session)
+
+    print(f"timing {SESSIONS} sessions of {len(SIZES)} sizes...")
+    for name, func in (("single resolver", resolve_single),
+                       ("multi-viewport resolver", resolve_multi)):
+        ms = timeit(func, number=20) * 1000 / 20
+        print(f"{name}: {ms:.2f} ms per change")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from io import StringIO
+from blessed import Terminal
+
+from tui.components.component import Component
+from tui.components.component_tree import ComponentTree
+from tui.components.component_style import Style
+from tui.components.examples.button import Button
+from tui.rendering.encoder import OutputEncoder
+from tui.rendering.framebuffer import DEFAULT_COLOR, FrameBuffer
+from tui.rendering.renderer import TerminalRenderer
+from tui.style_resolver.style_resolver import StyleResolver
+from tui.viewport import Viewport
+from tui.events import Event, EventType
+from tui.color import RGBA
+
+cont_style = Style(x=0, y=0,
+                   width="100%",
+                   height="100%",
+                   background_color=RGBA(20, 20, 50, 1),
+                   layout_direction="y")
+
+clr_1 = RGBA(163, 205, 255, 1)
+clr_2 = RGBA(100, 140, 255, 1)
+
+t = Terminal(kind="xterm-256color", force_styling=True)
+t.number_of_colors = 1 << 24
+tree = ComponentTree()
+viewport = Viewport(0, 0, 200, 60)
+resolver = StyleResolver(tree, viewport)
+buttons = []
+
+
+def layout():
+    tree.add_component(Component(cid="cont", style=cont_style))
+
+    for i in range(1, 30):
+        button = Button(text=f"Button {i}",
+                        cid=f"Button{i}",
+                        style=Style(width="50%", height=1,
+                                    background_color=clr_2, color=clr_1))
+        buttons.append(button)
+        tree.add_component(button, "cont")
+
+
+def legacy_frame() -> int:
+    """Byte count of a frame encoded like the renderer used to: a cursor
+    movement, both colors and a reset for every row of every component."""
+    out = StringIO()
+    for component in tree.traverse_components():
+        style = component.resolved_style
+        bg = str(t.on_color_rgb(style.background_color.r,
+                                style.background_color.g,
+                                style.background_color.b))
+        if style.background_color.a != 0:
+            row = bg + " " * style.width + "\x1b[m"
+            for i in range(style.height):
+                out.write(t.move_xy(style.x, style.y + i) + row)
+        if component.text:
+            fg = str(t.color_rgb(style.color.r, style.color.g, style.color.b))
+            out.write(bg + fg + t.move_xy(style.x, style.y) +
+                      component.text + "\x1b[m")
+    return len(out.getvalue().encode())
+
+
+def unpack(color: int):
+    return (color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF
+
+
+def naive_frame(back: FrameBuffer) -> int:
+    """Byte count of the changed runs encoded with an absolute cursor
+    movement and both colors for each run."""
+    front = FrameBuffer(back.width, back.height)
+    front.invalidate()
+    out = StringIO()
+    for run in back.diff(front):
+        out.write(t.move_xy(run.x, run.y))
+        out.write("\x1b[49m" if run.bg == DEFAULT_COLOR else
+                  str(t.on_color_rgb(*unpack(run.bg))))
+        out.write("\x1b[39m" if run.fg == DEFAULT_COLOR else
+                  str(t.color_rgb(*unpack(run.fg))))
+        out.write(run.text)
+    return len(out.getvalue().encode())
+
+
+def encoded_frame(renderer: TerminalRenderer) -> int:
+    out = bytearray()
+    # pylint: disable=protected-access
+    runs = renderer._back.diff(renderer._front,
+                               renderer._damage,
+                               OutputEncoder.MAX_GAP)
+    renderer._encoder.encode(runs, out, renderer._back.width)
+    return len(out)
+
+
+def main():
+    layout()
+    renderer = TerminalRenderer(t)
+
+    resolver.resolve()
+    renderer.render(tree, resolver.damage, dirty=resolver.dirty)
+    print("full frame")
+    print(f"    legacy:  {legacy_frame()} bytes")
+    # pylint: disable=protected-access
+    print(f"    runs:    {naive_frame(renderer._back)} bytes")
+    print(f"    encoder: {encoded_frame(renderer)} bytes")
+
+    buttons[3].enqueue_event(Event(EventType.FOCUS_IN))
+    buttons[3].process_events()
+    resolver.resolve()
+    renderer.render(tree, resolver.damage, dirty=resolver.dirty)
+
+    print("one button focused")
+    print(f"    legacy:  {legacy_frame()} bytes")
+    print(f"    encoder: {encoded_frame(renderer)} bytes")
+
+
+if __name__ == "__main__":
+    main()
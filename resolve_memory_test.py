@@ -0,0 +1,56 @@
+import tracemalloc
+
+from tui.components.component import Component
+from tui.components.component_tree import ComponentTree
+from tui.components.component_style import Style
+from tui.style_resolver.style_resolver import StyleResolver
+from tui.style_resolver.array_style_resolver import ArrayStyleResolver
+from tui.viewport import Viewport
+
+
+def layout() -> ComponentTree:
+    """Builds 100 columns of 100 rows sized relative to the viewport."""
+    tree = ComponentTree()
+    for i in range(100):
+        tree.add_component(Component(cid=f"col{i}",
+                                     style=Style(width="1%",
+                                                 height="100%",
+                                                 layout_direction="y")))
+        for j in range(100):
+            tree.add_component(
+                Component(text=f"{j}", cid=f"col{i}row{j}",
+                          style=Style(width="100%", height="1%")),
+                f"col{i}"
+            )
+    return tree
+
+
+def trace_resize(resolver_class: type[StyleResolver]) -> None:
+    """Prints the memory allocated while resolving the tree after the
+    viewport is resized, which changes every component."""
+    viewport = Viewport(0, 0, 300, 100)
+    resolver = resolver_class(layout(), viewport)
+    resolver.resolve()
+
+    viewport.width, viewport.height = 600, 200
+    tracemalloc.start()
+    resolver.resolve()
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    print(f"{resolver_class.__name__}:")
+    print(f"    peak:     {peak / 1024:.0f} KiB")
+    print(f"    retained: {current / 1024:.0f} KiB")
+    for stat in snapshot.statistics("lineno")[:3]:
+        print(f"        {stat}")
+
+
+def main():
+    print("tracing 10100 components...")
+    for resolver_class in (StyleResolver, ArrayStyleResolver):
+        trace_resize(resolver_class)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+from timeit import timeit
+
+from blessed import Terminal
+
+from tui.components.component import Component
+from tui.components.component_tree import ComponentTree
+from tui.components.component_style import Style
+from tui.components.examples.scroll_list import ScrollList
+from tui.focus_manager import FocusManager
+from tui.rendering.renderer import TerminalRenderer
+from tui.style_resolver.style_resolver import StyleResolver
+from tui.viewport import Viewport
+
+
+def bind_row(row: Component, index: int) -> None:
+    row.text = f"line {index}"
+
+
+def time_scrolling(row_count: int) -> float:
+    """Returns the time in milliseconds it takes to scroll a list of
+    `row_count` rows by a row, and to resolve, render and move focus."""
+    tree = ComponentTree()
+    scroll_list = ScrollList(row_count=row_count,
+                             row_factory=Component,
+                             bind_row=bind_row,
+                             cid="list",
+                             style=Style(width="100%", height="100%"))
+    tree.add_component(scroll_list)
+    viewport = Viewport(0, 0, 120, 40)
+    resolver = StyleResolver(tree, viewport)
+    renderer = TerminalRenderer(Terminal())
+    focus_manager = FocusManager(tree)
+
+    def frame():
+        resolver.resolve()
+        renderer.render(tree, resolver.damage, dirty=resolver.dirty)
+        scroll_list.process_events()
+        focus_manager.focus_next()
+
+    frame()
+
+    def scroll():
+        scroll_list.scroll_by(1)
+        frame()
+
+    return timeit(scroll, number=100) * 1000 / 100
+
+
+def main():
+    print("timing...")
+    for row_count in (1_000, 100_000, 1_000_000):
+        print(f"{row_count} rows: {time_scrolling(row_count):.2f} ms per scroll")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+from timeit import timeit
+
+from tui.components.component import Component
+from tui.components.component_tree import ComponentTree
+
+
+def deep() -> ComponentTree:
+    """Builds a chain of 1000 nested components."""
+    tree = ComponentTree()
+    tree.add_component(Component(cid="0"))
+    for i in range(1, 1000):
+        tree.add_component(Component(cid=f"{i}"), f"{i - 1}")
+    return tree
+
+
+def wide() -> ComponentTree:
+    """Builds a component with 100000 children."""
+    tree = ComponentTree()
+    tree.add_component(Component(cid="parent"))
+    for i in range(100000):
+        tree.add_component(Component(cid=f"{i}"), "parent")
+    return tree
+
+
+def time_traversals(tree: ComponentTree) -> float:
+    """Returns the time in milliseconds it takes to traverse the tree in
+    pre-order and in post-order, as done for every frame."""
+    def traverse():
+        for _ in tree.traverse():
+            pass
+        for _ in tree.traverse(reverse=True):
+            pass
+
+    return timeit(traverse, number=20) * 1000 / 20
+
+
+def main():
+    print("timing...")
+    for name, build in (("deep", deep), ("wide", wide)):
+        try:
+            ms = f"{time_traversals(build()):.2f} ms"
+        except RecursionError:
+            ms = "recursion limit exceeded"
+        print(f"{name}: {ms} per traversal")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+from timeit import timeit
+
+from tui.components.component import Component
+from tui.components.component_tree import ComponentTree, ComponentTreeBuilder
+from tui.components.component_style import Style
+from tui.style_resolver.style_resolver import StyleResolver
+from tui.viewport import Viewport
+
+ROWS = 5000
+
+
+def rows(generation: int) -> list:
+    return [(Component(cid=f"row{generation}-{i}",
+                       style=Style(width="100%", height=1,
+                                   layout_direction="x")),
+             [Component(text=f"{generation}", style=Style(width="50%")),
+              Component(text=f"{i}", style=Style(width="50%"))])
+            for i in range(ROWS)]
+
+
+def time_replacing(batched: bool) -> float:
+    """Returns the time in milliseconds it takes to replace the rows of a
+    table of 5000 rows of two cells, created beforehand, and to resolve the
+    table."""
+    tree = ComponentTree()
+    tree.add_component(Component(cid="table",
+                                 style=Style(width="100%", height="100%",
+                                             layout_direction="y")))
+    ComponentTreeBuilder(tree).replace_children("table", rows(0)).apply()
+    resolver = StyleResolver(tree, Viewport(0, 0, 120, 40))
+    resolver.resolve()
+
+    invalidations = 0
+
+    def count(_):
+        nonlocal invalidations
+        invalidations += 1
+
+    tree.add_invalidation_listener(count)
+    generations = [rows(generation) for generation in range(1, 6)]
+
+    def replace():
+        new_rows = generations.pop()
+        if batched:
+            ComponentTreeBuilder(tree).replace_children("table",
+                                                        new_rows).apply()
+        else:
+            table = tree.get_node(tree.get_component_by_id("table"))
+            for row in list(table.children):
+                tree.remove_component(row.component)
+            for row, cells in new_rows:
+                tree.add_component(row, "table")
+                for cell in cells:
+                    tree.add_component(cell, row.cid)
+        resolver.resolve()
+
+    ms = timeit(replace, number=5) * 1000 / 5
+    print(f"    {invalidations // 5} invalidations per replacement")
+    return ms
+
+
+def main():
+    print("timing...")
+    for batched in (False, True):
+        name = "builder" if batched else "one by one"
+        print(f"{name}: {time_replacing(batched):.2f} ms per replacement")
+
+
+if __name__ == "__main__":
+    main()
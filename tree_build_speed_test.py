@@ -0,0 +1,40 @@
+from time import perf_counter
+
+from tui.components.component import Component
+from tui.components.component_tree import ComponentTree
+from tui.components.component_style import Style
+
+
+def build(columns: int, rows: int) -> ComponentTree:
+    """Builds a tree of `columns` columns of `rows` rows, looking each
+    parent up by its id."""
+    tree = ComponentTree()
+    for i in range(columns):
+        tree.add_component(Component(cid=f"col{i}",
+                                     style=Style(layout_direction="y")))
+        for j in range(rows):
+            tree.add_component(Component(cid=f"col{i}row{j}",
+                                         text=f"{j}",
+                                         style=Style(height=1)),
+                               f"col{i}")
+    return tree
+
+
+def main():
+    print("timing...")
+    for columns, rows in ((10, 999), (100, 999)):
+        s = perf_counter()
+        tree = build(columns, rows)
+        built = perf_counter() - s
+
+        s = perf_counter()
+        for i in range(columns):
+            tree.get_component_by_id(f"col{i}row{rows - 1}")
+        looked_up = perf_counter() - s
+
+        print(f"{columns * (rows + 1)} components: built in {built:.2f} s, "
+              f"{looked_up / columns * 1e6:.2f} us per lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from random import Random
+from time import perf_counter
+
+from tui.components.component import Component
+from tui.components.component_tree import ComponentTree
+from tui.components.component_style import Style
+
+ROWS = 50000
+
+
+def build() -> ComponentTree:
+    """Builds two lists, the first with `ROWS` rows."""
+    tree = ComponentTree()
+    for cid in ("list", "other"):
+        tree.add_component(Component(cid=cid,
+                                     style=Style(layout_direction="y")))
+    for i in range(ROWS):
+        tree.add_component(Component(cid=f"row{i}", style=Style(height=1)),
+                           "list")
+    return tree
+
+
+def time_rows(operation) -> float:
+    """Returns the time in microseconds it takes to apply `operation` to
+    each row of the first list, in random order."""
+    tree = build()
+    rows = [tree.get_component_by_id(f"row{i}") for i in range(ROWS)]
+    Random(0).shuffle(rows)
+
+    s = perf_counter()
+    for row in rows:
+        operation(tree, row)
+    return (perf_counter() - s) / ROWS * 1e6
+
+
+def main():
+    print(f"timing {ROWS} rows...")
+    removal = time_rows(lambda tree, row: tree.remove_component(row))
+    print(f"remove: {removal:.2f} us per row")
+    move = time_rows(lambda tree, row: tree.move_component(row, "other"))
+    print(f"move: {move:.2f} us per row")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 class RGBA:
+    __slots__ = ("_r", "_g", "_b", "_a")
+
     def __init__(self, r: int, g: int, b: int, a: int = 1) -> None:
         self._validate_rgb(r)
         self._validate_rgb(g)
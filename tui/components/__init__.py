@@ -1,4 +1,5 @@
 from .component import Component
 from .component_style import Style
 from .component_tree import ComponentTree, ComponentTreeNode, ComponentTreeBuilder
-from .examples import Button, Input
+from .examples import Button, Input, ScrollList
+from .ui_file import load_ui, compile_ui, build_ui, COMPONENT_TYPES
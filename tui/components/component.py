@@ -1,11 +1,21 @@
 from __future__ import annotations
 from abc import ABC
+from typing import TYPE_CHECKING
 
 from ..events import Event, EventListener, EventQueue
-from .component_style import Style
+from .component_style import ResolvedStyle, Style
+
+if TYPE_CHECKING:
+    from .component_tree import ComponentTree
 
 
 class Component(ABC):
+    # Components are weakly referenced by the result stores and renderers
+    # that keep something for them.
+    __slots__ = ("_cid", "_text", "_style", "_resolved_style",
+                 "_is_focusable", "_event_queue", "_dirty", "_tree",
+                 "__weakref__")
+
     def __init__(
         self, *,
         cid: str = None,
@@ -18,35 +28,54 @@ class Component(ABC):
         self._cid = cid
         self._text = text
 
-        # Changes are made to _resolved_style throughout the "resolution
-        # pipeline". A copy is needed to not have the original style rules in
-        # `_style` be altered.
-        # `_prev_resolved_style` is used for checking whether the style is
-        # "dirty", i.e. re-rendering is needed.
+        # The position and sizes of the component are resolved into
+        # `_resolved_style` by the "resolution pipeline", leaving the original
+        # style rules in `_style` unaltered.
         self._style = style
-        self._resolved_style: Style = None
-        self._prev_resolved_style: Style = None
+        if style is not None:
+            style.add_observer(self)
+        self._resolved_style: ResolvedStyle = None
 
         self._is_focusable = focusable
 
-        self._event_queue = EventQueue()
+        # Created when the first listener is added or event queued, as most
+        # components never get either.
+        self._event_queue: EventQueue | None = None
 
         # Whether `resolved_style` has changed, whether to re-render.
         self._dirty: bool = False
 
+        # The tree the component is in. The tree is told when the component
+        # needs its style resolved again.
+        self._tree: ComponentTree | None = None
+
         self.set_up()
 
     def set_up(self):
         pass
 
     def add_event_listener(self, event_listener: EventListener):
+        if self._event_queue is None:
+            self._event_queue = EventQueue()
         self._event_queue.add_event_listener(event_listener)
 
     def enqueue_event(self, event: Event):
+        if self._event_queue is None:
+            self._event_queue = EventQueue()
         self._event_queue.enqueue_event(event)
 
     def process_events(self):
-        self._event_queue.process_events()
+        if self._event_queue is not None:
+            self._event_queue.process_events()
+
+    def invalidate(self) -> None:
+        """Marks the component's style to be resolved again. This is done
+        whenever the style or the text changes."""
+        if self._tree is not None:
+            self._tree.invalidate(self)
+
+    def style_changed(self, style: Style) -> None:
+        self.invalidate()
 
     @property
     def is_focusable(self) -> bool:
@@ -60,29 +89,39 @@ class Component(ABC):
     def text(self) -> str:
         return self._text
 
+    @text.setter
+    def text(self, new: str):
+        self._text = new
+        self.invalidate()
+
     @property
     def style(self) -> Style:
         return self._style
 
     @style.setter
     def style(self, new: Style):
+        if self._style is not None:
+            self._style.remove_observer(self)
         self._style = new
+        if new is not None:
+            new.add_observer(self)
+        self.invalidate()
 
     @property
-    def resolved_style(self) -> Style:
-        return self._resolved_style
+    def tree(self) -> ComponentTree | None:
+        return self._tree
 
-    @resolved_style.setter
-    def resolved_style(self, new: Style):
-        self._resolved_style = new
+    @tree.setter
+    def tree(self, new: ComponentTree | None):
+        self._tree = new
 
     @property
-    def prev_resolved_style(self) -> Style:
-        return self._prev_resolved_style
+    def resolved_style(self) -> ResolvedStyle:
+        return self._resolved_style
 
-    @prev_resolved_style.setter
-    def prev_resolved_style(self, new: Style):
-        self._prev_resolved_style = new
+    @resolved_style.setter
+    def resolved_style(self, new: ResolvedStyle):
+        self._resolved_style = new
 
     @property
     def dirty(self) -> bool:
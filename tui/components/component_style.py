@@ -1,11 +1,22 @@
 from __future__ import annotations
 from dataclasses import dataclass, field, fields
-from typing import Union, TypeAlias, Literal
+from itertools import count
+from typing import Any, List, Protocol, Union, TypeAlias, Literal
+from weakref import ref
 
 from ..color import RGBA
 
 Unit: TypeAlias = Union[int, float, str, None]
 
+# Versions of all styles are drawn from one counter, so that a version number
+# identifies the values of a single style at one point in time.
+_versions = count(1)
+
+
+class StyleObserver(Protocol):
+    def style_changed(self, style: Style) -> None:
+        ...
+
 
 # pylint: disable=too-many-instance-attributes
 @dataclass(eq=True, kw_only=True)
@@ -43,6 +54,63 @@ class Style:
     layout_direction: str = field(default="x")
     gap: Union[int, float, str] = field(default=0)
 
+    def __post_init__(self) -> None:
+        self.__dict__["_version"] = next(_versions)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self.__dict__[name] = value
+        if "_version" not in self.__dict__:
+            # Set by `__init__`, which is not a change to report.
+            return
+        # Every change gets a new version, and is reported to the observers.
+        self.__dict__["_version"] = next(_versions)
+        observers = self.__dict__.get("_observers")
+        if observers:
+            observers[:] = _live(observers)
+            for observer in [r() for r in observers]:
+                observer.style_changed(self)
+
+    def __copy__(self) -> Style:
+        # A copy has the same version as the original, as it has the same
+        # values, but none of its observers.
+        new = object.__new__(Style)
+        new.__dict__.update(self.__dict__)
+        new.__dict__.pop("_observers", None)
+        new.__dict__.pop("_observers_limit", None)
+        return new
+
+    @property
+    def version(self) -> int:
+        """A number that changes whenever a value of the style is set, for
+        telling whether the style has changed without comparing its values.
+        """
+        return self.__dict__["_version"]
+
+    def add_observer(self, observer: StyleObserver) -> None:
+        """Makes `observer.style_changed` be called whenever a value of the
+        style is set. Observers are referenced weakly.
+
+        The weak references are kept in a plain list rather than a `WeakSet`,
+        which would cost several times the memory, as a style usually has
+        a single observer, the component it belongs to.
+        """
+        observers = self.__dict__.setdefault("_observers", [])
+        observers.append(ref(observer))
+        # References to observers no longer alive, or added twice, are
+        # dropped once the list has doubled, so that adding stays constant
+        # time for styles shared by many components.
+        limit = self.__dict__.get("_observers_limit", 8)
+        if len(observers) >= limit:
+            observers[:] = _live(observers)
+            self.__dict__["_observers_limit"] = max(8, 2 * len(observers))
+
+    def remove_observer(self, observer: StyleObserver) -> None:
+        """Stops calling `observer`. Observers no longer alive are dropped as
+        well."""
+        observers = self.__dict__.get("_observers")
+        if observers:
+            observers[:] = [r for r in _live(observers) if r() is not observer]
+
     def __add__(self, other: object) -> Style:
         """
         Combine two instances of Style.
@@ -80,3 +148,62 @@ class Style:
             setattr(result, f, new_value)
 
         return result
+
+
+def _live(observers: List[ref]) -> List[ref]:
+    """Returns the references to observers still alive, each observer once."""
+    if len(observers) == 1:
+        return observers if observers[0]() is not None else []
+    seen = set()
+    live = []
+    for r in observers:
+        observer = r()
+        if observer is not None and id(observer) not in seen:
+            seen.add(id(observer))
+            live.append(r)
+    return live
+
+
+class ResolvedStyle:
+    """The resolved position and sizes of a component, and the text they
+    were resolved with. Other values are read from the style they were
+    resolved from.
+
+    A component keeps its resolved style between resolutions, and it is
+    updated in place, so that resolving does not copy the component's style.
+    """
+
+    __slots__ = ("style", "version", "text",
+                 "x", "y", "width", "height", "min_width", "min_height")
+
+    def __init__(self, style: Style, text: str) -> None:
+        self.update(style, text, None, None, None, None, None, None)
+
+    def update(self,
+               style: Style,
+               text: str,
+               x: Unit,
+               y: Unit,
+               width: Unit,
+               height: Unit,
+               min_width: Unit,
+               min_height: Unit) -> None:
+        """Sets the resolved position and sizes, and the style and text they
+        were resolved from. The version of the style is kept, so that
+        comparing it to the version at an earlier resolution tells whether
+        the style changed between them."""
+        self.style = style
+        self.version = style.version
+        self.text = text
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.min_width = min_width
+        self.min_height = min_height
+
+    def __getattr__(self, name: str) -> Any:
+        # Called only for the values not resolved, see `__slots__`.
+        if name == "style":
+            raise AttributeError(name)
+        return getattr(self.style, name)
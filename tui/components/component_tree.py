@@ -1,76 +1,97 @@
 from __future__ import annotations
 
-from typing import List, Generator
+from contextlib import contextmanager
+from typing import (Callable, Dict, Iterable, List, Generator, Iterator, Self,
+                    Set, Tuple, TypeAlias)
 
 from .component import Component
 from .component_style import Style
 
 
 class ComponentTreeNode:
+    # Nodes link, unlink and traverse each other through their slots.
+    # pylint: disable=protected-access
+    __slots__ = ("_component", "_parent", "_children", "_children_list")
+
     def __init__(self,
                  component: Component,
                  parent: ComponentTreeNode = None,
                  children: List[ComponentTreeNode] = None) -> None:
         self._component = component
         self._parent = parent
-        if children is None:
-            self._children = []
-        else:
-            self._children = children
+        # The children are the keys of a dict, which keeps them in order and
+        # lets a child be unlinked in constant time however many siblings it
+        # has. The list of `children` is built when first needed after the
+        # children change.
+        self._children: Dict[ComponentTreeNode, None] = (
+            {} if children is None else dict.fromkeys(children)
+        )
+        self._children_list: List[ComponentTreeNode] | None = None
 
-    def add_child(self, component: Component):
+    def add_child(self, component: Component) -> ComponentTreeNode:
         node = ComponentTreeNode(component, self, None)
-        self._children.append(node)
+        self._link_child(node)
+        return node
 
-    def get_node_by_component(self, component: Component) -> ComponentTreeNode | None:
-        if self._component == component:
-            return self
+    def _link_child(self, node: ComponentTreeNode) -> None:
+        """Makes `node` the last child of this node."""
+        self._children[node] = None
+        self._children_list = None
+        node._parent = self
 
-        for child in self._children:
-            node = child.get_node_by_component(component)
-            if node is not None:
-                return node
+    def _unlink(self) -> None:
+        """Removes this node from the children of its parent."""
+        del self._parent._children[self]
+        self._parent._children_list = None
+        self._parent = None
 
+    def get_node_by_component(self, component: Component) -> ComponentTreeNode | None:
+        for node in self.traverse():
+            if node._component == component:
+                return node
         return None
 
     def get_node_by_component_id(self, cid: str) -> ComponentTreeNode | None:
-        if self._component.cid == cid:
-            return self
-
-        for child in self._children:
-            node = child.get_node_by_component_id(cid)
-            if node:
+        for node in self.traverse():
+            if node._component.cid == cid:
                 return node
-
         return None
 
     def traverse(self, reverse: bool = False) -> Generator[ComponentTreeNode, None, None]:
+        """Visits the nodes of the subtree in pre-order, or in post-order if
+        `reverse` is set. The nodes are visited iteratively, so that trees of
+        any depth can be traversed."""
         if reverse is False:
-            yield self
-
-        for child in self._children:
-            yield from child.traverse(reverse=reverse)
-
-        if reverse is True:
-            yield self
+            stack = [self]
+            while stack:
+                node = stack.pop()
+                yield node
+                stack.extend(reversed(node._children))
+        else:
+            # Nodes are visited once their children have been.
+            stack = [(self, False)]
+            while stack:
+                node, children_visited = stack.pop()
+                if children_visited:
+                    yield node
+                else:
+                    stack.append((node, True))
+                    stack.extend((child, False)
+                                 for child in reversed(node._children))
 
     def traverse_components(self, reverse: bool = False) -> Generator[Component, None, None]:
-        if reverse is False:
-            yield self._component
-
-        for child in self._children:
-            yield from child.traverse_components(reverse=reverse)
-
-        if reverse is True:
-            yield self._component
+        for node in self.traverse(reverse=reverse):
+            yield node._component
 
     @property
     def parent(self):
         return self._parent
 
     @property
-    def children(self):
-        return self._children
+    def children(self) -> List[ComponentTreeNode]:
+        if self._children_list is None:
+            self._children_list = list(self._children)
+        return self._children_list
 
     @property
     def component(self):
@@ -94,6 +115,12 @@ class ComponentTreeNode:
         return self.__str__()
 
 
+# A component, or a component along with the descriptions of its children.
+ComponentDescription: TypeAlias = (
+    Component | Tuple[Component, Iterable["ComponentDescription"]]
+)
+
+
 class ComponentTree:
     def __init__(self) -> None:
         root_style = Style(position="relative", x=0, y=0,
@@ -101,40 +128,320 @@ class ComponentTree:
         self._root = ComponentTreeNode(
             Component(cid="root", style=root_style)
         )
+        self._root.component.tree = self
+
+        # The nodes of the components in the tree, by component and by id.
+        # Components without an id are only found by component.
+        self._nodes_by_component: Dict[Component, ComponentTreeNode] = {
+            self._root.component: self._root
+        }
+        self._nodes_by_cid: Dict[str, ComponentTreeNode] = {
+            self._root.component.cid: self._root
+        }
+
+        # The nodes in pre-order and in post-order, kept until the tree
+        # changes, see `traverse`.
+        self._preorder: List[ComponentTreeNode] | None = None
+        self._postorder: List[ComponentTreeNode] | None = None
+        self._preorder_components: List[Component] | None = None
+        self._postorder_components: List[Component] | None = None
+        self._preorder_indices: Dict[Component, int] | None = None
+
+        # Called with components whose styles need to be resolved again.
+        self._invalidation_listeners: List[Callable[[Component], None]] = []
+        # Called with each component of a subtree leaving the tree.
+        self._unmount_listeners: List[Callable[[Component], None]] = []
+        # The components invalidated and the components added during a
+        # batch, see `batch`. Dict keys keep the order of invalidation.
+        self._batch_depth = 0
+        self._batched: Dict[Component, None] = {}
+        self._batch_added: Set[Component] = set()
+
+    def add_invalidation_listener(self, listener: Callable[[Component], None]) -> None:
+        """Adds a listener called with a component whose style needs to be
+        resolved again, i.e. whose style, text or children have changed."""
+        self._invalidation_listeners.append(listener)
+
+    def remove_invalidation_listener(self, listener: Callable[[Component], None]) -> None:
+        self._invalidation_listeners.remove(listener)
+
+    def add_unmount_listener(self, listener: Callable[[Component], None]) -> None:
+        """Adds a listener called with each component leaving the tree, i.e.
+        the component removed or detached and each of its descendants,
+        parents before their children. Used to drop what is kept per
+        component, e.g. focus or cached paint, as soon as it leaves."""
+        self._unmount_listeners.append(listener)
+
+    def remove_unmount_listener(self, listener: Callable[[Component], None]) -> None:
+        self._unmount_listeners.remove(listener)
+
+    def invalidate(self, component: Component) -> None:
+        if self._batch_depth > 0:
+            self._batched[component] = None
+            return
+
+        for listener in self._invalidation_listeners:
+            listener(component)
+
+    @contextmanager
+    def batch(self) -> Generator[ComponentTree, None, None]:
+        """Groups changes to the tree and its components, so that each
+        component changed is invalidated once, when the outermost batch
+        ends, however many times it changed. Components no longer in the
+        tree by then are not invalidated, nor are components added during
+        the batch, as they are new to the ones the tree is invalidated for
+        anyway, through the parents they were added to."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                batched, self._batched = self._batched, {}
+                added, self._batch_added = self._batch_added, set()
+                for component in batched:
+                    if (component in self._nodes_by_component
+                            and component not in added):
+                        self.invalidate(component)
 
     def remove_component(self, component: Component) -> None:
-        node = self._root.get_node_by_component(component)
-        if node is None:
-            raise ValueError(f"Component '{component}' not "
+        """Removes a component, along with its descendants, from the tree."""
+        self._unmount(self._get_child_node(component))
+
+    def detach_component(self, component: Component) -> ComponentDescription:
+        """Removes a component, along with its descendants, from the tree.
+
+        Returns:
+            ComponentDescription: The description of the removed subtree, to
+            add it back with `add_components`, e.g. after changing it.
+        """
+        node = self._get_child_node(component)
+        self._unmount(node)
+
+        # Descriptions are built leaves first, parents after their children.
+        descriptions: Dict[ComponentTreeNode, ComponentDescription] = {}
+        for descendant in node.traverse(reverse=True):
+            if descendant.children:
+                descriptions[descendant] = (
+                    descendant.component,
+                    [descriptions.pop(child) for child in descendant.children]
+                )
+            else:
+                descriptions[descendant] = descendant.component
+        return descriptions[node]
+
+    def move_component(self, component: Component, parent_id: str = None) -> None:
+        """Moves a component, along with its descendants, to be the last
+        child of the component of `parent_id`, or of the root if None. The
+        components stay in the tree, so no unmount listeners are called."""
+        node = self._get_child_node(component)
+        parent_node = self._get_parent_node(parent_id)
+        ancestor = parent_node
+        while ancestor is not None:
+            if ancestor is node:
+                raise ValueError(f"Component '{component.cid}' cannot be "
+                                 "moved into its own subtree.")
+            ancestor = ancestor.parent
+
+        old_parent = node.parent
+        # Nodes are linked by the tree only, see `ComponentTreeNode`.
+        # pylint: disable=protected-access
+        node._unlink()
+        parent_node._link_child(node)
+        self._clear_orders()
+        self.invalidate(old_parent.component)
+        self.invalidate(parent_node.component)
+
+    def _get_child_node(self, component: Component) -> ComponentTreeNode:
+        """Returns the node of a component in the tree other than the root."""
+        node = self._nodes_by_component.get(component)
+        if node is None or node.parent is None:
+            raise ValueError(f"Component '{component.cid}' not "
                              "found in the component tree.")
+        return node
+
+    def _unmount(self, node: ComponentTreeNode) -> None:
+        """Unlinks the subtree of `node` from the tree, and tells the unmount
+        listeners about each of its components."""
+        parent = node.parent
+        # pylint: disable-next=protected-access
+        node._unlink()
+        self._clear_orders()
+        for removed in node.traverse_components():
+            del self._nodes_by_component[removed]
+            if removed.cid is not None:
+                del self._nodes_by_cid[removed.cid]
+            removed.tree = None
+            for listener in self._unmount_listeners:
+                listener(removed)
+        self.invalidate(parent.component)
+
+    def _get_parent_node(self, parent_id: str | None) -> ComponentTreeNode:
+        if parent_id is None:
+            return self._root
+
+        parent_node = self._nodes_by_cid.get(parent_id)
+        if parent_node is None:
+            raise ValueError(f"Component with id '{parent_id}' not "
+                             "found in the component tree.")
+        return parent_node
 
-        node.parent.children.remove(node)
+    def get_node(self, component: Component) -> ComponentTreeNode | None:
+        return self._nodes_by_component.get(component)
 
     def get_component_by_id(self, cid: str) -> Component:
-        node = self._root.get_node_by_component_id(cid)
+        node = self._nodes_by_cid.get(cid)
         return node.component if node is not None else None
 
     def add_component(self, component: Component, parent_id: str = None) -> None:
-        if parent_id is None:
-            self._root.add_child(component)
-            return
-
-        parent_node = self._root.get_node_by_component_id(parent_id)
-        if parent_node is None:
-            raise ValueError(f"Component with id '{parent_id}' not "
-                             "found in the component tree.")
+        self._add_child(component, self._get_parent_node(parent_id))
+
+    def add_components(self,
+                       description: ComponentDescription,
+                       parent_id: str = None) -> None:
+        """Adds the described components under the component of `parent_id`,
+        or under the root if None."""
+        stack = [(description, self._get_parent_node(parent_id))]
+        while stack:
+            description, parent_node = stack.pop()
+            if isinstance(description, Component):
+                component, children = description, ()
+            else:
+                component, children = description
+
+            node = self._add_child(component, parent_node)
+            stack.extend((child, node) for child in reversed(list(children)))
+
+    def _add_child(self,
+                   component: Component,
+                   parent_node: ComponentTreeNode) -> ComponentTreeNode:
+        if component in self._nodes_by_component:
+            raise ValueError(f"Component '{component.cid}' is already in "
+                             "the component tree.")
+        if component.cid is not None and component.cid in self._nodes_by_cid:
+            raise ValueError(f"Component with id '{component.cid}' already "
+                             "exists in the component tree.")
+
+        node = parent_node.add_child(component)
+        self._clear_orders()
+        self._nodes_by_component[component] = node
+        if component.cid is not None:
+            self._nodes_by_cid[component.cid] = node
+        component.tree = self
+        if self._batch_depth > 0:
+            self._batch_added.add(component)
+        self.invalidate(parent_node.component)
+        return node
 
-        parent_node.add_child(component)
+    @property
+    def root(self) -> ComponentTreeNode:
+        return self._root
+
+    def _clear_orders(self) -> None:
+        self._preorder = None
+        self._postorder = None
+        self._preorder_components = None
+        self._postorder_components = None
+        self._preorder_indices = None
+
+    def traverse(self, reverse: bool = False) -> Iterator[ComponentTreeNode]:
+        """Iterates over the nodes in pre-order, or in post-order if `reverse`
+        is set. The orders are kept in lists until the tree changes, and the
+        tree may be changed while iterating, which leaves the ongoing
+        iteration unaffected."""
+        if reverse is False:
+            if self._preorder is None:
+                self._preorder = list(self._root.traverse())
+            return iter(self._preorder)
 
-    def traverse(self, reverse: bool = False) -> Generator[ComponentTreeNode, None, None]:
-        yield from self._root.traverse(reverse=reverse)
+        if self._postorder is None:
+            self._postorder = list(self._root.traverse(reverse=True))
+        return iter(self._postorder)
 
-    def traverse_components(self, reverse: bool = False) -> Generator[Component, None, None]:
-        yield from self._root.traverse_components(reverse=reverse)
+    def traverse_components(self, reverse: bool = False) -> Iterator[Component]:
+        if reverse is False:
+            if self._preorder_components is None:
+                self._preorder_components = [
+                    node.component for node in self.traverse()
+                ]
+            return iter(self._preorder_components)
+
+        if self._postorder_components is None:
+            self._postorder_components = [
+                node.component for node in self.traverse(reverse=True)
+            ]
+        return iter(self._postorder_components)
+
+    def get_preorder_index(self, component: Component) -> int | None:
+        """Returns the position of `component` in pre-order, i.e. the order
+        in which components are painted, or None if it is not in the tree.
+        """
+        if self._preorder_indices is None:
+            self._preorder_indices = {
+                component: i
+                for i, component in enumerate(self.traverse_components())
+            }
+        return self._preorder_indices.get(component)
 
     def join_tree(self):
         ...
 
 
 class ComponentTreeBuilder:
-    ...
+    """Collects changes to a component tree, and applies them all at once in
+    a batch, see `ComponentTree.batch`. The components changed are then
+    invalidated once, after all the changes, e.g. a table whose rows are
+    replaced is invalidated once instead of once for each row.
+
+    Changes are described by chaining, e.g.
+    `ComponentTreeBuilder(tree).remove(old).add((box, [a, b]), "cont").apply()`.
+    """
+
+    def __init__(self, tree: ComponentTree) -> None:
+        self._tree = tree
+        self._operations: List[Callable[[], None]] = []
+
+    def add(self,
+            description: ComponentDescription,
+            parent_id: str = None) -> Self:
+        """Adds the described components under the component of `parent_id`,
+        or under the root if None."""
+        self._operations.append(
+            lambda: self._tree.add_components(description, parent_id)
+        )
+        return self
+
+    def remove(self, component: Component) -> Self:
+        self._operations.append(
+            lambda: self._tree.remove_component(component)
+        )
+        return self
+
+    def move(self, component: Component, parent_id: str = None) -> Self:
+        self._operations.append(
+            lambda: self._tree.move_component(component, parent_id)
+        )
+        return self
+
+    def replace_children(self,
+                         parent_id: str | None,
+                         descriptions: Iterable[ComponentDescription]) -> Self:
+        """Replaces the children of the component of `parent_id`, or of the
+        root if None, with the described components."""
+        def replace():
+            # pylint: disable=protected-access
+            parent_node = self._tree._get_parent_node(parent_id)
+            for child in list(parent_node.children):
+                self._tree.remove_component(child.component)
+            for description in descriptions:
+                self._tree.add_components(description, parent_id)
+
+        self._operations.append(replace)
+        return self
+
+    def apply(self) -> None:
+        """Applies the changes in the order they were described."""
+        operations, self._operations = self._operations, []
+        with self._tree.batch():
+            for operation in operations:
+                operation()
@@ -1,2 +1,3 @@
 from .input import Input
 from .button import Button
+from .scroll_list import ScrollList
@@ -1,12 +1,15 @@
 from collections import deque
 from string import printable
 
-from ...events import Event, EventType, EventListener, EventQueue
+from ...events import Event, EventType, EventListener
 from ...utils.logger import log
 from ..component import Component
 
 
 class Input(Component):
+    __slots__ = ("_max_len", "_value", "_max_hist_len", "_history",
+                 "_hist_pointer", "_cursor_pos")
+
     def set_up(self):
         self._is_focusable = True
 
@@ -21,7 +24,7 @@ class Input(Component):
 
         key_listener = EventListener(
             [EventType.KEY_PRESS], self._handle_key_event)
-        self._event_queue.add_event_listener(key_listener)
+        self.add_event_listener(key_listener)
 
     def _update_history(self) -> None:
         # Checks if history is branching; if yes, clears previous
@@ -89,7 +92,7 @@ class Input(Component):
             if key == "KEY_BACKSPACE":  # backspace
                 self._erase()
             elif key == "KEY_ENTER":
-                self._event_queue.enqueue_event(Event(EventType.ACTIVATE))
+                self.enqueue_event(Event(EventType.ACTIVATE))
             elif key == "KEY_RIGHT":
                 self._move_pointer(1)
             elif key == "KEY_LEFT":
@@ -97,6 +100,5 @@ class Input(Component):
         elif str(key) in printable:
             self._write(str(key))
 
-        self._resolved_style.dirty = True
-        self._text = "".join(self._value)
+        self.text = "".join(self._value)
         log(key, self._text)
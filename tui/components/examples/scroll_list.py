@@ -0,0 +1,172 @@
+from dataclasses import replace
+from typing import Callable, List
+
+from ...events import Event, EventType, EventListener
+from ..component import Component
+from ..component_style import Style
+
+
+class ScrollList(Component):
+    """A list of rows that only has the rows in view in the component tree,
+    so that a list of any length costs as much to resolve, render and move
+    focus over as a screenful of rows.
+
+    Rows are shown by row components created by `row_factory`, one for each
+    row in view, stacked from the top of the list. A row component is filled
+    with the data of a row by `bind_row`, which is called again whenever the
+    component is reused for another row, e.g. when the list scrolls. Row
+    components no longer needed, e.g. when the list shrinks, are kept for
+    reuse.
+
+    Row components are added under the list in the tree, so the list needs
+    a `cid`. How many rows are in view depends on the resolved height of the
+    list, and is updated when the list processes its events.
+    """
+
+    __slots__ = ("_row_count", "_row_factory", "_bind_row", "_row_height",
+                 "_offset", "_rows_in_view", "_slots", "_bound", "_free")
+
+    def __init__(self, *,
+                 row_count: int,
+                 row_factory: Callable[[], Component],
+                 bind_row: Callable[[Component, int], None],
+                 row_height: int = 1,
+                 cid: str = None,
+                 style: Style = None) -> None:
+        """
+        Args:
+            row_count (int): The number of rows in the list.
+            row_factory (Callable[[], Component]): Creates a component for
+            showing a row.
+            bind_row (Callable[[Component, int], None]): Shows the row of the
+            given index in the given component, e.g. by setting its text.
+            row_height (int): The height of each row.
+        """
+        self._row_count = row_count
+        self._row_factory = row_factory
+        self._bind_row = bind_row
+        self._row_height = row_height
+
+        # The index of the topmost row in view, and the number of rows in view.
+        self._offset = 0
+        self._rows_in_view = 0
+
+        # The row components in the tree, top to bottom, the index of the row
+        # each one shows, and the row components not in the tree.
+        self._slots: List[Component] = []
+        self._bound: List[int] = []
+        self._free: List[Component] = []
+
+        # The given style is copied, as other components may share it.
+        style = replace(style if style is not None else Style(),
+                        layout_direction="y")
+        super().__init__(cid=cid, focusable=True, style=style)
+
+    def set_up(self):
+        key_listener = EventListener([EventType.KEY_PRESS],
+                                     self._handle_key_event)
+        self.add_event_listener(key_listener)
+
+    def _handle_key_event(self, event: Event) -> None:
+        key = event.data.get("key", "")
+        if key == "KEY_PGDOWN":
+            self.scroll_by(max(self._rows_in_view, 1))
+        elif key == "KEY_PGUP":
+            self.scroll_by(-max(self._rows_in_view, 1))
+        elif key == "KEY_HOME":
+            self.scroll_to(0)
+        elif key == "KEY_END":
+            self.scroll_to(self._row_count)
+
+    def process_events(self):
+        super().process_events()
+        self._update_rows()
+
+    def scroll_to(self, index: int) -> None:
+        """Scrolls the row of `index` to the top of the list, or as close to
+        it as the length of the list allows."""
+        last_offset = max(self._row_count - self._rows_in_view, 0)
+        offset = min(max(index, 0), last_offset)
+        if offset != self._offset:
+            self._offset = offset
+            self._update_rows()
+
+    def scroll_by(self, rows: int) -> None:
+        self.scroll_to(self._offset + rows)
+
+    def refresh(self) -> None:
+        """Fills in the rows again, e.g. after their data has changed."""
+        for row, index in zip(self._slots, self._bound):
+            self._bind_row(row, index)
+
+    @property
+    def offset(self) -> int:
+        """The index of the topmost row in view."""
+        return self._offset
+
+    @property
+    def row_count(self) -> int:
+        return self._row_count
+
+    @row_count.setter
+    def row_count(self, new: int):
+        self._row_count = new
+        self._update_rows()
+
+    @Component.tree.setter
+    def tree(self, new):
+        # Row components are removed from the tree along with the list.
+        if new is None:
+            self._free.extend(self._slots)
+            self._slots.clear()
+            self._bound.clear()
+        self._tree = new
+
+    def _get_rows_in_view(self) -> int:
+        resolved = self.resolved_style
+        if resolved is None or not resolved.height:
+            return 0
+        # Only whole rows are shown, as children are not clipped to the list.
+        return resolved.height // self._row_height
+
+    def _update_rows(self) -> None:
+        """Adds or removes row components to match the rows in view, and
+        fills in the ones whose rows have changed."""
+        if self._tree is None:
+            return
+
+        # Rows added back to a tree along with the list, e.g. by
+        # `ComponentTree.detach_component` and `add_components`, are taken out
+        # again, as the list adds the rows it shows itself.
+        for row in self._free:
+            if row.tree is not None:
+                row.tree.remove_component(row)
+
+        self._rows_in_view = self._get_rows_in_view()
+        self._offset = min(self._offset,
+                           max(self._row_count - self._rows_in_view, 0))
+        shown = min(self._rows_in_view, self._row_count - self._offset)
+
+        while len(self._slots) > shown:
+            row = self._slots.pop()
+            self._bound.pop()
+            self._tree.remove_component(row)
+            self._free.append(row)
+        while len(self._slots) < shown:
+            row = self._free.pop() if self._free else self._create_row()
+            self._slots.append(row)
+            self._bound.append(-1)
+            self._tree.add_component(row, self._cid)
+
+        for slot, row in enumerate(self._slots):
+            index = self._offset + slot
+            if self._bound[slot] != index:
+                self._bound[slot] = index
+                self._bind_row(row, index)
+
+    def _create_row(self) -> Component:
+        row = self._row_factory()
+        row.style = replace(row.style if row.style is not None else Style(),
+                            width="100%",
+                            height=self._row_height)
+        return row
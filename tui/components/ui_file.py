@@ -0,0 +1,323 @@
+from __future__ import annotations
+from copy import copy
+from dataclasses import fields
+from hashlib import sha256
+from json import loads
+from mmap import mmap, ACCESS_READ
+import marshal
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+from ..color import RGBA
+from ..style_resolver.units import Position, Size
+from .component import Component
+from .component_style import Style
+from .component_tree import ComponentDescription, ComponentTree
+from .examples import Button, Input
+
+# A UI file describes components declaratively, as JSON, e.g.
+#
+#     {
+#         "styles": {
+#             "button": {"width": "100%", "height": 1,
+#                        "color": [163, 205, 255]},
+#             "wide": {"extends": "button", "width": "50%"}
+#         },
+#         "components": [
+#             {"type": "Component", "cid": "menu",
+#              "style": {"layout_direction": "y"},
+#              "children": [
+#                  {"type": "Button", "cid": "ok", "text": "OK",
+#                   "style": "wide"}
+#              ]}
+#         ]
+#     }
+#
+# Styles are named in "styles", or given inline. Either may extend a named
+# style, overriding some of its values. Colors are [r, g, b] or [r, g, b, a].
+# "type" defaults to "Component", and every other key of a component is
+# optional.
+
+# The compiled form of a UI file. Styles are interned, so that components
+# with the same style values share one entry, given as pairs of style field
+# and value with colors as (r, g, b, a) tuples. Components are listed in
+# pre-order, each as its type, id, text, the index of its style or -1, and
+# the index of its parent or -1 if at the top level. Only builtin types are
+# used, so that the compiled form can be cached with `marshal`.
+CompiledStyle = Tuple[Tuple[str, Any], ...]
+CompiledComponent = Tuple[str, str | None, str, int, int]
+CompiledUI = Tuple[Tuple[CompiledStyle, ...], Tuple[CompiledComponent, ...]]
+
+# The component types a UI file can use by default, by name.
+COMPONENT_TYPES: Dict[str, type[Component]] = {
+    "Component": Component,
+    "Button": Button,
+    "Input": Input,
+}
+
+_STYLE_FIELDS = {f.name for f in fields(Style)}
+_COLOR_FIELDS = {f.name for f in fields(Style) if f.type == "RGBA"}
+_POSITION_FIELDS = {"x", "y"}
+_SIZE_FIELDS = {"width", "height",
+                "min_width", "min_height",
+                "max_width", "max_height"}
+_COMPONENT_KEYS = {"type", "cid", "text", "style", "children"}
+
+# Changed whenever the compiled form changes, so that older caches are not
+# loaded.
+_CACHE_VERSION = b"1"
+_CACHE_SUFFIX = ".uic"
+
+
+def load_ui(path: str | os.PathLike,
+            tree: ComponentTree,
+            parent_id: str = None,
+            types: Mapping[str, type[Component]] = None,
+            cache_dir: str | os.PathLike = None) -> None:
+    """Adds the components described by the UI file at `path` under the
+    component of `parent_id`, or under the root if None.
+
+    The file is compiled on the first load, and the compiled form is cached
+    in `cache_dir` under the hashes of the file's path and contents. Later
+    loads of the same contents map the cache into memory instead of parsing
+    the file.
+
+    Args:
+        path (str | os.PathLike): The UI file to load.
+        tree (ComponentTree): The tree to add the components to.
+        parent_id (str): The id of the component to add the components under.
+        types (Mapping[str, type[Component]]): The component types the file
+        can use, by name. Defaults to `COMPONENT_TYPES`.
+        cache_dir (str | os.PathLike): Where to cache the compiled file.
+        Defaults to the `__pycache__` directory next to the file.
+    """
+    path = Path(path)
+    source = path.read_bytes()
+    if cache_dir is None:
+        cache_dir = path.parent / "__pycache__"
+
+    # Caches are named after the file and a hash of its path, so that files
+    # of the same name in different directories have their own caches.
+    path_digest = sha256(str(path.resolve()).encode()).hexdigest()[:8]
+    prefix = f"{path.name}.{path_digest}"
+    digest = sha256(_CACHE_VERSION + source).hexdigest()[:16]
+    cache_path = Path(cache_dir) / f"{prefix}.{digest}{_CACHE_SUFFIX}"
+
+    compiled = _read_cache(cache_path)
+    if compiled is None:
+        compiled = compile_ui(source.decode("utf-8"))
+        _write_cache(cache_path, prefix, compiled)
+
+    build_ui(compiled, tree, parent_id, types)
+
+
+def compile_ui(source: str) -> CompiledUI:
+    """Compiles the contents of a UI file, checking its styles and
+    structure.
+
+    Raises:
+        ValueError: If the source is not a valid UI file.
+    """
+    ui = loads(source)
+    if not isinstance(ui, dict):
+        raise ValueError("A UI file must contain an object.")
+
+    named = ui.get("styles", {})
+    if not isinstance(named, dict):
+        raise ValueError("'styles' must be an object of named styles.")
+
+    resolved: Dict[str, Dict[str, Any]] = {}
+    style_indices: Dict[CompiledStyle, int] = {}
+
+    def intern_style(spec: Any) -> int:
+        values = _resolve_style(spec, named, resolved, ())
+        compiled = tuple(sorted(values.items()))
+        return style_indices.setdefault(compiled, len(style_indices))
+
+    specs = ui.get("components", [])
+    if not isinstance(specs, list):
+        raise ValueError("'components' must be a list of components.")
+
+    components: List[CompiledComponent] = []
+    # The specifications are visited in pre-order, with the index of their
+    # parents.
+    stack = [(spec, -1) for spec in reversed(specs)]
+    while stack:
+        spec, parent_index = stack.pop()
+        component, children = _compile_component(spec, parent_index,
+                                                 intern_style)
+        stack.extend((child, len(components)) for child in reversed(children))
+        components.append(component)
+
+    return tuple(style_indices), tuple(components)
+
+
+def build_ui(compiled: CompiledUI,
+             tree: ComponentTree,
+             parent_id: str = None,
+             types: Mapping[str, type[Component]] = None) -> None:
+    """Adds the components of a compiled UI file under the component of
+    `parent_id`, or under the root if None. See `load_ui`."""
+    if types is None:
+        types = COMPONENT_TYPES
+    compiled_styles, compiled_components = compiled
+
+    # Each component gets a copy of its interned style, as components may
+    # change their styles.
+    styles = [_create_style(style) for style in compiled_styles]
+    descriptions: List[Tuple[Component, List[ComponentDescription]]] = []
+    top: List[ComponentDescription] = []
+    for compiled_component in compiled_components:
+        description = (_create_component(compiled_component, styles, types),
+                       [])
+        descriptions.append(description)
+        parent_index = compiled_component[4]
+        if parent_index < 0:
+            top.append(description)
+        else:
+            descriptions[parent_index][1].append(description)
+
+    with tree.batch():
+        for description in top:
+            tree.add_components(description, parent_id)
+
+
+def _compile_component(spec: Any,
+                       parent_index: int,
+                       intern_style: Callable[[Any], int]
+                       ) -> Tuple[CompiledComponent, List[Any]]:
+    """Checks the specification of a component, and returns its compiled
+    form along with the specifications of its children."""
+    if not isinstance(spec, dict):
+        raise ValueError(f"A component must be an object, not '{spec}'.")
+    unknown = spec.keys() - _COMPONENT_KEYS
+    if unknown:
+        raise ValueError(f"Unknown component keys: {sorted(unknown)}.")
+
+    type_name = spec.get("type", "Component")
+    cid = spec.get("cid")
+    text = spec.get("text", "")
+    style = spec.get("style")
+    children = spec.get("children", [])
+    if not isinstance(type_name, str):
+        raise ValueError(f"'type' must be a string, not '{type_name}'.")
+    if not isinstance(cid, (str, type(None))):
+        raise ValueError(f"'cid' must be a string, not '{cid}'.")
+    if not isinstance(text, str):
+        raise ValueError(f"'text' must be a string, not '{text}'.")
+    if not isinstance(children, list):
+        raise ValueError("'children' must be a list of components.")
+
+    return ((type_name,
+             cid,
+             text,
+             -1 if style is None else intern_style(style),
+             parent_index),
+            children)
+
+
+def _create_component(compiled: CompiledComponent,
+                      styles: List[Style],
+                      types: Mapping[str, type[Component]]) -> Component:
+    """Creates a component of a compiled UI file, with a copy of its
+    style."""
+    type_name, cid, text, style_index, _ = compiled
+    component_type = types.get(type_name)
+    if component_type is None:
+        raise ValueError(f"Unknown component type '{type_name}'.")
+
+    style = copy(styles[style_index]) if style_index >= 0 else None
+    return component_type(cid=cid, text=text, style=style)
+
+
+def _resolve_style(spec: Any,
+                   named: Dict[str, Any],
+                   resolved: Dict[str, Dict[str, Any]],
+                   extending: Tuple[str, ...]) -> Dict[str, Any]:
+    """Returns the values of a style given by name or inline, along with the
+    values of the styles it extends. Colors are given as (r, g, b, a)
+    tuples."""
+    if isinstance(spec, str):
+        if spec in resolved:
+            return resolved[spec]
+        if spec not in named:
+            raise ValueError(f"Style '{spec}' not found.")
+        if spec in extending:
+            raise ValueError(f"Style '{spec}' extends itself.")
+        values = resolved[spec] = _resolve_style(named[spec], named, resolved,
+                                                 extending + (spec,))
+        return values
+
+    if not isinstance(spec, dict):
+        raise ValueError(f"A style must be a name or an object, not '{spec}'.")
+
+    values = {}
+    base = spec.get("extends")
+    if base is not None:
+        values.update(_resolve_style(base, named, resolved, extending))
+
+    for name, value in spec.items():
+        if name == "extends":
+            continue
+        if name not in _STYLE_FIELDS:
+            raise ValueError(f"Unknown style field '{name}'.")
+        values[name] = _compile_value(name, value)
+    return values
+
+
+def _compile_value(name: str, value: Any) -> Any:
+    """Checks a style value, so that invalid values are found when compiling
+    rather than when resolving."""
+    if name in _COLOR_FIELDS:
+        if not isinstance(value, list) or len(value) not in (3, 4):
+            raise ValueError(f"'{name}' must be [r, g, b] or [r, g, b, a].")
+        color = RGBA(*value)
+        return (color.r, color.g, color.b, color.a)
+
+    if not isinstance(value, (str, int, float, type(None))):
+        raise ValueError(f"'{name}' must be a string or a number.")
+    if value is not None:
+        # Units are only checked here. Styles keep the values as written,
+        # which the resolvers parse once per distinct value, see `Size.of`.
+        if name in _POSITION_FIELDS:
+            Position.of(value)
+        elif name in _SIZE_FIELDS:
+            Size.of(value)
+    return value
+
+
+def _create_style(compiled: CompiledStyle) -> Style:
+    return Style(**{name: RGBA(*value) if name in _COLOR_FIELDS else value
+                    for name, value in compiled})
+
+
+def _read_cache(cache_path: Path) -> CompiledUI | None:
+    """Returns the compiled UI file cached at `cache_path`, or None if there
+    is none."""
+    try:
+        with open(cache_path, "rb") as file:
+            with mmap(file.fileno(), 0, access=ACCESS_READ) as cache:
+                return marshal.loads(cache)
+    except (OSError, ValueError, EOFError, TypeError):
+        # Missing, empty or unreadable caches are compiled again.
+        return None
+
+
+def _write_cache(cache_path: Path, prefix: str, compiled: CompiledUI) -> None:
+    """Caches a compiled UI file, replacing the caches of the earlier
+    contents of the file, i.e. the caches named with the same `prefix`.
+    Caching is skipped where the cache cannot be written."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        digest = "[0-9a-f]" * 16
+        for stale in cache_path.parent.glob(f"{prefix}.{digest}{_CACHE_SUFFIX}"):
+            stale.unlink(missing_ok=True)
+
+        # Written under another name first, so that a load never maps a
+        # partly written cache.
+        temporary = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_bytes(marshal.dumps(compiled))
+        os.replace(temporary, cache_path)
+    except OSError:
+        pass
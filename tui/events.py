@@ -1,6 +1,6 @@
 from __future__ import annotations
 from collections import deque
-from typing import Callable, List
+from typing import Callable, Iterable, List
 from enum import Enum, auto
 
 
@@ -36,6 +36,8 @@ class Event:
     can be retrieved e.g. when handling the event.
     """
 
+    __slots__ = ("_data", "_event_type")
+
     def __init__(self, event_type: EventType, data: int | str | None = None) -> None:
         self._data = data
         self._event_type = event_type
@@ -53,8 +55,10 @@ class Event:
 
 
 class EventListener:
+    __slots__ = ("_listening_to", "_callback")
+
     def __init__(self,
-                 listening_to: List[EventType] | set[EventType],
+                 listening_to: Iterable[EventType],
                  callback: Callable[[Event], None]) -> None:
         """
         Args:
@@ -62,14 +66,16 @@ class EventListener:
             the event listener listens to / is subscribed to.
         """
         super().__init__()
-        self._listening_to = set(listening_to)
+        # A frozenset given is shared rather than copied, so that listeners
+        # created for many components can share their event types.
+        self._listening_to = frozenset(listening_to)
         self._callback = callback
 
     def handle_event(self, event: Event):
         self._callback(event)
 
     @property
-    def listening_to(self) -> set[EventType]:
+    def listening_to(self) -> frozenset[EventType]:
         return self._listening_to
 
 
@@ -86,14 +92,20 @@ class EventEmitter:
 
 
 class EventQueue:
+    __slots__ = ("_event_listeners", "_event_queue")
+
     def __init__(self) -> None:
         self._event_listeners: List[EventListener] = []
-        self._event_queue: deque[Event] = deque()
+        # Created when the first event is queued, as many queues never get
+        # any events.
+        self._event_queue: deque[Event] | None = None
 
     def add_event_listener(self, event_listener: EventListener):
         self._event_listeners.append(event_listener)
 
     def enqueue_event(self, event: Event):
+        if self._event_queue is None:
+            self._event_queue = deque()
         self._event_queue.append(event)
 
     def _notify_listeners(self, event: Event):
@@ -109,6 +121,9 @@ class EventQueue:
         running this function. New events added during the processing are
         processed on the next run.
         """
+        if not self._event_queue:
+            return
+
         event = None
         event_count = len(self._event_queue)
         for _ in range(event_count):
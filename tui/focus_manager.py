@@ -7,6 +7,12 @@ class FocusManager:
     def __init__(self, component_tree: ComponentTree) -> None:
         self._focused_component: Component | None = None
         self._component_tree = component_tree
+        component_tree.add_unmount_listener(self._handle_unmount)
+
+    def _handle_unmount(self, component: Component):
+        # Components leaving the tree can no longer be focused.
+        if component is self._focused_component:
+            self.remove_focus()
 
     def remove_focus(self):
         if self._focused_component:
@@ -0,0 +1,52 @@
+from time import monotonic
+from typing import Callable
+
+
+class FrameScheduler:
+    """Schedules frames so that any number of requests for a new frame made
+    between two ticks results in at most one frame, and frames are drawn at
+    most `max_fps` times per second. No frame is drawn when none has been
+    requested.
+    """
+
+    def __init__(self, draw_frame: Callable[[], None], max_fps: float = 60) -> None:
+        """
+        Args:
+            draw_frame (Callable[[], None]): Draws a frame.
+            max_fps (float): The largest number of frames drawn per second.
+        """
+        self._draw_frame = draw_frame
+        self._frame_interval = 1 / max_fps
+        self._last_frame_time = float("-inf")
+        self._is_frame_requested = False
+
+    def request_frame(self) -> None:
+        """Requests a new frame to be drawn on a following tick."""
+        self._is_frame_requested = True
+
+    def time_until_frame(self) -> float | None:
+        """Returns the time in seconds until the requested frame can be
+        drawn, or None if no frame has been requested."""
+        if not self._is_frame_requested:
+            return None
+        next_frame_time = self._last_frame_time + self._frame_interval
+        return max(next_frame_time - monotonic(), 0)
+
+    def tick(self) -> bool:
+        """Draws a frame if one has been requested and the frame rate allows
+        it.
+
+        Returns:
+            bool: Whether a frame was drawn.
+        """
+        if not self._is_frame_requested:
+            return False
+
+        now = monotonic()
+        if now < self._last_frame_time + self._frame_interval:
+            return False
+
+        self._is_frame_requested = False
+        self._last_frame_time = now
+        self._draw_frame()
+        return True
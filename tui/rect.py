@@ -0,0 +1,87 @@
+from __future__ import annotations
+from typing import Iterable, List, NamedTuple, Tuple
+
+
+class Rect(NamedTuple):
+    """An axis-aligned rectangle of screen cells."""
+    x: int
+    y: int
+    width: int
+    height: int
+
+    @property
+    def right(self) -> int:
+        return self.x + self.width
+
+    @property
+    def bottom(self) -> int:
+        return self.y + self.height
+
+    def is_empty(self) -> bool:
+        return self.width <= 0 or self.height <= 0
+
+    def intersects(self, other: Rect) -> bool:
+        return (self.x < other.right and other.x < self.right
+                and self.y < other.bottom and other.y < self.bottom)
+
+    def intersection(self, other: Rect) -> Rect | None:
+        """Returns the overlapping area of the two rectangles, or None if
+        they do not overlap."""
+        x0, y0 = max(self.x, other.x), max(self.y, other.y)
+        x1, y1 = min(self.right, other.right), min(self.bottom, other.bottom)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return Rect(x0, y0, x1 - x0, y1 - y0)
+
+    def union(self, other: Rect) -> Rect:
+        """Returns the smallest rectangle containing both rectangles."""
+        x0, y0 = min(self.x, other.x), min(self.y, other.y)
+        x1, y1 = max(self.right, other.right), max(self.bottom, other.bottom)
+        return Rect(x0, y0, x1 - x0, y1 - y0)
+
+
+# Merging more rectangles than this is quadratic for little gain, so past it
+# they are merged into their bounding rectangle instead, see `merge_rects`.
+MAX_MERGED_RECTS = 64
+
+
+def merge_rects(rects: Iterable[Rect],
+                max_rects: int = MAX_MERGED_RECTS) -> List[Rect]:
+    """Merges overlapping rectangles into their bounding rectangles until no
+    two rectangles in the result overlap. Empty rectangles are dropped.
+
+    Args:
+        rects (Iterable[Rect]): The rectangles to merge.
+        max_rects (int): The most rectangles to return. If more are left
+        after merging, their bounding rectangle is returned instead.
+
+    Returns:
+        List[Rect]: Non-overlapping rectangles covering all given rectangles.
+    """
+    # The rectangles are merged as (left, top, right, bottom) tuples, which
+    # are compared without going through the properties of `Rect`.
+    merged: List[Tuple[int, int, int, int]] = []
+    for rect in rects:
+        if rect.is_empty():
+            continue
+
+        # A merged rectangle may grow to overlap ones already in the list,
+        # so keep merging until it stands alone.
+        x0, y0, x1, y1 = rect.x, rect.y, rect.right, rect.bottom
+        i = 0
+        while i < len(merged):
+            left, top, right, bottom = merged[i]
+            if left < x1 and x0 < right and top < y1 and y0 < bottom:
+                del merged[i]
+                x0, y0 = min(x0, left), min(y0, top)
+                x1, y1 = max(x1, right), max(y1, bottom)
+                i = 0
+            else:
+                i += 1
+        merged.append((x0, y0, x1, y1))
+
+        if len(merged) > max_rects:
+            merged = [(min(m[0] for m in merged), min(m[1] for m in merged),
+                       max(m[2] for m in merged), max(m[3] for m in merged))]
+
+    return [Rect(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in merged]
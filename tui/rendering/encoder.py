@@ -0,0 +1,258 @@
+from typing import Callable, Dict, Iterable, List, Tuple
+from blessed import Terminal
+from wcwidth import wcswidth
+
+from .framebuffer import DEFAULT_COLOR, Run
+
+# Stands for a pen attribute whose state on the terminal is not known.
+_UNKNOWN = object()
+
+# Parameter values passed to capabilities when compiling them. They are
+# unlikely to appear in a capability's output for any other reason.
+_MARKERS = (4013, 7019)
+
+
+def _compile_capability(cap: Callable[..., str], arity: int) -> Callable[..., bytes] | None:
+    """Compiles a parameterized terminfo capability into a function building
+    the same output with plain bytes formatting.
+
+    The capability is evaluated once with marker values as its parameters,
+    and the places where the markers appear in the output are replaced with
+    format fields. If the output cannot be understood this way, the returned
+    function falls back to evaluating the capability, caching the results.
+
+    Args:
+        cap (Callable[..., str]): The capability, e.g. `Terminal.cup`.
+        arity (int): The number of parameters the capability takes.
+
+    Returns:
+        Callable[..., bytes] | None: A function taking the capability's
+        parameters and returning its output as bytes, or None if the terminal
+        does not have the capability.
+    """
+    markers = _MARKERS[:arity]
+    sample = str(cap(*markers))
+    if not sample:
+        return None
+
+    # Each parameter appears in the output either as is or incremented by
+    # one, as in capabilities using 1-based coordinates.
+    fields: List[Tuple[int, int, int]] = []
+    for i, marker in enumerate(markers):
+        for offset in (0, 1):
+            digits = str(marker + offset)
+            if sample.count(digits) == 1:
+                fields.append((sample.find(digits), i, offset))
+                break
+
+    if len(fields) == arity:
+        fields.sort()
+        template = b""
+        prev = 0
+        for pos, i, offset in fields:
+            template += sample[prev:pos].encode().replace(b"%", b"%%") + b"%d"
+            prev = pos + len(str(markers[i] + offset))
+        template += sample[prev:].encode().replace(b"%", b"%%")
+
+        if arity == 1:
+            offset = fields[0][2]
+            return lambda n: template % (n + offset)
+
+        return lambda *args: template % tuple(
+            args[i] + offset for _, i, offset in fields
+        )
+
+    cache: Dict[Tuple[int, ...], bytes] = {}
+
+    def evaluate(*args: int) -> bytes:
+        c = cache.get(args, None)
+        if c is None:
+            c = str(cap(*args)).encode()
+            cache[args] = c
+        return c
+
+    return evaluate
+
+
+class OutputEncoder:
+    """Encodes runs of cells into terminal output.
+
+    The encoder tracks the state of the terminal's "pen", i.e. the current
+    colors and cursor position, and writes only the sequences needed to
+    change it. Colors are set only when they differ from the current ones,
+    and every cursor jump uses the shortest of the available movements:
+    absolute, relative, carriage return and line feed, or a combination of
+    these.
+
+    The terminal's capabilities are read from terminfo once, when the
+    encoder is created. After that, output is built with bytes formatting
+    and lookup tables only.
+    """
+
+    # Unchanged cells between two runs are cheaper to write over than to
+    # move past when there are at most this many, as the shortest relative
+    # cursor movement takes three bytes.
+    MAX_GAP = 3
+
+    def __init__(self, term: Terminal) -> None:
+        self._cup = _compile_capability(term.cup, 2)
+        self._cuf = _compile_capability(term.cuf, 1)
+        self._cub = _compile_capability(term.cub, 1)
+        self._cuu = _compile_capability(term.cuu, 1)
+        self._cud = _compile_capability(term.cud, 1)
+        self._hpa = _compile_capability(term.hpa, 1)
+        self._vpa = _compile_capability(term.vpa, 1)
+        self._normal = str(term.normal).encode()
+
+        self._does_styling = term.does_styling
+        self._truecolor = term.number_of_colors == 1 << 24
+        self._downconvert = term.rgb_downconvert
+        # Without true color support, colors are approximated with the
+        # terminal's palette, whose sequences are looked up from these tables.
+        colors = 0 if self._truecolor else term.number_of_colors
+        self._fg_table = [str(term.color(i)).encode() for i in range(colors)]
+        self._bg_table = [str(term.on_color(i)).encode() for i in range(colors)]
+
+        default_fg = b"\x1b[39m" if self._does_styling else b""
+        default_bg = b"\x1b[49m" if self._does_styling else b""
+        self._fg_color_cache: Dict[int, bytes] = {DEFAULT_COLOR: default_fg}
+        self._bg_color_cache: Dict[int, bytes] = {DEFAULT_COLOR: default_bg}
+
+        self._fg = _UNKNOWN
+        self._bg = _UNKNOWN
+        self._x: int | None = None
+        self._y: int | None = None
+
+    def reset(self) -> None:
+        """Forgets the pen state, e.g. after the terminal has been resized or
+        written to by something else. The next run is preceded by an absolute
+        cursor movement and both colors."""
+        self._fg = _UNKNOWN
+        self._bg = _UNKNOWN
+        self._x = None
+        self._y = None
+
+    def _encode_color(self, color: int, sgr: bytes, table: List[bytes]) -> bytes:
+        if not self._does_styling:
+            return b""
+
+        r, g, b = (color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF
+        if self._truecolor:
+            return b"\x1b[%s;2;%d;%d;%dm" % (sgr, r, g, b)
+        if not table:
+            return b""
+        return table[self._downconvert(r, g, b)]
+
+    def _get_color(self, color: int) -> bytes:
+        # NOTE: using `setdefault` would be cleaner, but with it the color
+        # would be encoded even if it is cached.
+        c = self._fg_color_cache.get(color, None)
+        if c is None:
+            c = self._encode_color(color, b"38", self._fg_table)
+            self._fg_color_cache[color] = c
+
+        return c
+
+    def _get_bg_color(self, bg_color: int) -> bytes:
+        c = self._bg_color_cache.get(bg_color, None)
+        if c is None:
+            c = self._encode_color(bg_color, b"48", self._bg_table)
+            self._bg_color_cache[bg_color] = c
+
+        return c
+
+    def _move_x(self, from_x: int | None, x: int) -> bytes | None:
+        """Returns the shortest sequence moving the cursor from column
+        `from_x` to `x` on the same row, or None if the terminal has no
+        capabilities for it. `from_x` of None means the column is not known.
+        """
+        if from_x == x:
+            return b""
+
+        candidates = []
+        if self._hpa is not None:
+            candidates.append(self._hpa(x))
+        if x == 0:
+            candidates.append(b"\r")
+        elif self._cuf is not None:
+            candidates.append(b"\r" + self._cuf(x))
+            if from_x is not None and x > from_x:
+                candidates.append(self._cuf(x - from_x))
+        if from_x is not None and x < from_x and self._cub is not None:
+            candidates.append(self._cub(from_x - x))
+
+        return min(candidates, key=len) if candidates else None
+
+    def _move(self, x: int, y: int) -> bytes:
+        """Returns the shortest sequence moving the cursor to (x, y)."""
+        if self._cup is None:
+            return b""
+
+        best = self._cup(y, x)
+        if self._y is None:
+            return best
+
+        candidates = []
+
+        dy = y - self._y
+        if dy == 0:
+            candidates.append((b"", self._x))
+        elif dy > 0 and self._cud is not None:
+            candidates.append((self._cud(dy), self._x))
+        elif dy < 0 and self._cuu is not None:
+            candidates.append((self._cuu(-dy), self._x))
+        if dy > 0:
+            # Carriage return and line feeds, which leave the cursor on the
+            # first column.
+            candidates.append((b"\r\n" * dy, 0))
+        if self._vpa is not None:
+            candidates.append((self._vpa(y), self._x))
+
+        for vertical, from_x in candidates:
+            horizontal = self._move_x(from_x, x)
+            if horizontal is not None and len(vertical) + len(horizontal) < len(best):
+                best = vertical + horizontal
+
+        return best
+
+    def encode(self, runs: Iterable[Run], out: bytearray, width: int) -> None:
+        """Writes the output drawing `runs` into `out`. The colors are reset
+        at the end, so that the terminal is left with its default colors.
+
+        Args:
+            runs (Iterable[Run]): The runs to draw.
+            out (bytearray): The buffer to append the output to.
+            width (int): The width of the screen.
+        """
+        write = out.extend
+        for run in runs:
+            write(self._move(run.x, run.y))
+
+            if run.bg != self._bg:
+                write(self._get_bg_color(run.bg))
+                self._bg = run.bg
+            if run.fg != self._fg:
+                write(self._get_color(run.fg))
+                self._fg = run.fg
+
+            write(run.text.encode())
+
+            # Wide characters take two columns on the terminal and combining
+            # characters none, so the cursor is moved as far as the terminal
+            # shows the text to be wide. Text of unknown width, e.g. with
+            # control characters, leaves the position unknown.
+            text_width = (len(run.text) if run.text.isascii()
+                          else wcswidth(run.text))
+            self._x = run.x + text_width if text_width >= 0 else None
+            self._y = run.y
+            # Writing to the last column leaves the cursor in a state that
+            # differs between terminals, e.g. waiting to wrap to the next
+            # line, so its position is not relied on.
+            if self._x is None or self._x >= width:
+                self._x = None
+                self._y = None
+
+        if self._fg != DEFAULT_COLOR or self._bg != DEFAULT_COLOR:
+            write(self._normal)
+            self._fg = DEFAULT_COLOR
+            self._bg = DEFAULT_COLOR
@@ -0,0 +1,299 @@
+from __future__ import annotations
+from typing import Generator, Iterable, NamedTuple, Tuple
+
+import numpy as np
+
+from ..color import RGBA
+from ..rect import Rect
+
+# Cell colors are stored packed into integers as 0xRRGGBB. This value stands
+# for the terminal's default color.
+DEFAULT_COLOR = -1
+
+# A character no cell can hold, used for invalidating cells.
+_INVALID_CHAR = 0xFFFFFFFF
+_BLANK = ord(" ")
+
+
+def pack_color(color: RGBA) -> int:
+    """Packs the RGB channels of `color` into an integer."""
+    return (color.r << 16) | (color.g << 8) | color.b
+
+
+def _blend(below: np.ndarray, color: RGBA) -> np.ndarray:
+    """Blends `color` over an array of packed colors according to the alpha
+    of `color`. The default color is blended over as if it were black.
+
+    Args:
+        below (np.ndarray): The packed colors beneath.
+        color (RGBA): The color on top.
+
+    Returns:
+        np.ndarray: The blended, packed colors.
+    """
+    a = color.a
+    below = np.where(below == DEFAULT_COLOR, 0, below)
+    r = ((below >> 16) & 0xFF) * (1 - a) + color.r * a
+    g = ((below >> 8) & 0xFF) * (1 - a) + color.g * a
+    b = (below & 0xFF) * (1 - a) + color.b * a
+    return ((r.astype(np.int32) << 16)
+            | (g.astype(np.int32) << 8)
+            | b.astype(np.int32))
+
+
+class Run(NamedTuple):
+    """A horizontal run of cells sharing the same colors. The colors are
+    packed, see `pack_color`."""
+    x: int
+    y: int
+    text: str
+    fg: int
+    bg: int
+
+
+def _find_runs(changed_idx: np.ndarray,
+               fg: np.ndarray,
+               bg: np.ndarray,
+               width: int,
+               max_gap: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the starts and stops of the runs of changed cells, given the
+    indices of the changed cells and the colors of all cells of an area
+    `width` cells wide, flattened."""
+    # Number the stretches of same-colored cells within each row. Two changed
+    # cells belong to the same run if they are in the same stretch and at
+    # most `max_gap` unchanged cells apart.
+    color_break = np.ones(fg.size, dtype=bool)
+    color_break[1:] = (fg[1:] != fg[:-1]) | (bg[1:] != bg[:-1])
+    color_break[::width] = True
+    stretch = np.cumsum(color_break)[changed_idx]
+
+    breaks = ((np.diff(changed_idx) > max_gap + 1)
+              | (np.diff(stretch) != 0))
+    last = np.flatnonzero(breaks)
+    starts = changed_idx[np.concatenate(([0], last + 1))]
+    stops = changed_idx[np.append(last, changed_idx.size - 1)] + 1
+    return starts, stops
+
+
+def _create_runs(chars: np.ndarray,
+                 fg: np.ndarray,
+                 bg: np.ndarray,
+                 runs: Tuple[np.ndarray, np.ndarray],
+                 rect: Rect) -> Generator[Run, None, None]:
+    """Yields the runs of the flattened cells of `rect`, given their starts
+    and stops, see `_find_runs`."""
+    starts, stops = runs
+    for start, stop, run_fg, run_bg in zip(starts.tolist(),
+                                           stops.tolist(),
+                                           fg[starts].tolist(),
+                                           bg[starts].tolist()):
+        y, x = divmod(start, rect.width)
+        yield Run(x + rect.x,
+                  y + rect.y,
+                  chars[start:stop].tobytes().decode("utf-32-le"),
+                  run_fg,
+                  run_bg)
+
+
+def encode_text(text: str) -> np.ndarray:
+    """Returns the code points of the characters of `text`."""
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+class Fill(NamedTuple):
+    """Paints the background of a rectangle of the given size."""
+    width: int
+    height: int
+    color: RGBA
+
+    def paint(self,
+              buffer: FrameBuffer,
+              x: int,
+              y: int,
+              clip: Rect | None = None) -> None:
+        buffer.fill(Rect(x, y, self.width, self.height), self.color, clip)
+
+
+class Text(NamedTuple):
+    """Paints text on a single row. The text is stored as code points, see
+    `encode_text`."""
+    chars: np.ndarray
+    color: RGBA
+
+    def paint(self,
+              buffer: FrameBuffer,
+              x: int,
+              y: int,
+              clip: Rect | None = None) -> None:
+        buffer.write(x, y, self.chars, self.color, clip)
+
+
+class FrameBuffer:
+    """A grid of terminal cells. Every cell holds a character, a foreground
+    color and a background color.
+
+    The cells are stored in three 2D NumPy arrays, one per attribute, so
+    that painting and comparing areas are array operations. Characters are
+    stored as code points and colors packed into integers.
+    """
+
+    def __init__(self, width: int = 0, height: int = 0) -> None:
+        self._width = 0
+        self._height = 0
+        self._chars = np.empty((0, 0), dtype=np.uint32)
+        self._fg = np.empty((0, 0), dtype=np.int32)
+        self._bg = np.empty((0, 0), dtype=np.int32)
+        self.resize(width, height)
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def rect(self) -> Rect:
+        return Rect(0, 0, self._width, self._height)
+
+    def resize(self, width: int, height: int) -> None:
+        """Resizes the buffer. The contents are cleared."""
+        self._width = max(width, 0)
+        self._height = max(height, 0)
+        shape = (self._height, self._width)
+        self._chars = np.full(shape, _BLANK, dtype=np.uint32)
+        self._fg = np.full(shape, DEFAULT_COLOR, dtype=np.int32)
+        self._bg = np.full(shape, DEFAULT_COLOR, dtype=np.int32)
+
+    def _clip(self, rect: Rect, clip: Rect | None) -> Tuple[slice, slice] | None:
+        """Returns the slices of the cells within both `rect` and `clip`, or
+        None if there are no such cells."""
+        rect = rect.intersection(self.rect)
+        if rect is not None and clip is not None:
+            rect = rect.intersection(clip)
+        if rect is None:
+            return None
+        return slice(rect.y, rect.bottom), slice(rect.x, rect.right)
+
+    def clear(self, rect: Rect | None = None) -> None:
+        """Sets every cell, or the cells within `rect`, to a blank space with
+        default colors."""
+        area = self._clip(rect or self.rect, None)
+        if area is None:
+            return
+
+        self._chars[area] = _BLANK
+        self._fg[area] = DEFAULT_COLOR
+        self._bg[area] = DEFAULT_COLOR
+
+    def invalidate(self, rect: Rect | None = None) -> None:
+        """Puts every cell, or the cells within `rect`, into a state that
+        differs from any drawable cell, so that the next diff against this
+        buffer reports them."""
+        area = self._clip(rect or self.rect, None)
+        if area is not None:
+            self._chars[area] = _INVALID_CHAR
+
+    def fill(self, rect: Rect, color: RGBA, clip: Rect | None = None) -> None:
+        """Paints the background of a rectangle with `color`, clipped to the
+        buffer and to `clip`, if given.
+
+        An opaque color replaces the cells with blank spaces. A translucent
+        color is blended over both colors of the cells, leaving their
+        characters visible beneath it.
+        """
+        if color.a == 0:
+            return
+
+        area = self._clip(rect, clip)
+        if area is None:
+            return
+
+        if color.a >= 1:
+            self._chars[area] = _BLANK
+            self._fg[area] = DEFAULT_COLOR
+            self._bg[area] = pack_color(color)
+            return
+
+        self._bg[area] = _blend(self._bg[area], color)
+        fg = self._fg[area]
+        self._fg[area] = np.where(fg == DEFAULT_COLOR, fg, _blend(fg, color))
+
+    def write(self,
+              x: int,
+              y: int,
+              text: str | np.ndarray,
+              color: RGBA,
+              clip: Rect | None = None) -> None:
+        """Writes `text` on a single row starting from (x, y), keeping the
+        background of the cells. A translucent color is blended over the
+        background. The text is clipped to the buffer and to `clip`, if given.
+
+        The text may also be given as code points, see `encode_text`.
+        """
+        if color.a == 0:
+            return
+
+        area = self._clip(Rect(x, y, len(text), 1), clip)
+        if area is None:
+            return
+
+        if isinstance(text, str):
+            text = encode_text(text)
+
+        rows, cols = area
+        self._chars[rows, cols] = text[cols.start - x:cols.stop - x]
+        if color.a >= 1:
+            self._fg[rows, cols] = pack_color(color)
+        else:
+            self._fg[rows, cols] = _blend(self._bg[rows, cols], color)
+
+    def diff(self,
+             front: FrameBuffer,
+             rects: Iterable[Rect] | None = None,
+             max_gap: int = 0) -> Generator[Run, None, None]:
+        """Yields the runs of cells in this buffer that differ from `front`.
+        `front` is updated to match this buffer, so that it always holds what
+        has been sent to the screen.
+
+        Both buffers must be of the same size.
+
+        Args:
+            front (FrameBuffer): The buffer to compare against.
+            rects (Iterable[Rect] | None): Compare only the cells within these
+            non-overlapping rectangles. If None, all cells are compared.
+            max_gap (int): Runs of the same colors that are separated by at
+            most this many unchanged cells are joined into one run.
+        """
+        if rects is None:
+            rects = [self.rect]
+
+        for rect in rects:
+            rect = rect.intersection(self.rect)
+            if rect is not None:
+                yield from self._diff_rect(front, rect, max_gap)
+
+    def _diff_rect(self,
+                   front: FrameBuffer,
+                   rect: Rect,
+                   max_gap: int) -> Generator[Run, None, None]:
+        # The front buffer is brought up to date along with the diff.
+        # pylint: disable=protected-access
+        area = slice(rect.y, rect.bottom), slice(rect.x, rect.right)
+        chars, fg, bg = self._chars[area], self._fg[area], self._bg[area]
+
+        changed = ((chars != front._chars[area])
+                   | (fg != front._fg[area])
+                   | (bg != front._bg[area]))
+        changed_idx = np.flatnonzero(changed)
+        if changed_idx.size == 0:
+            return
+
+        front._chars[area] = chars
+        front._fg[area] = fg
+        front._bg[area] = bg
+
+        chars, fg, bg = chars.ravel(), fg.ravel(), bg.ravel()
+        runs = _find_runs(changed_idx, fg, bg, rect.width, max_gap)
+        yield from _create_runs(chars, fg, bg, runs, rect)
@@ -0,0 +1,145 @@
+import os
+from threading import Condition, Thread
+from typing import List, Tuple
+
+from ..rect import Rect
+
+
+def write_all(fd: int, data: bytes | bytearray) -> None:
+    """Writes all of `data` to the file descriptor `fd`, with as many writes
+    as it takes and without copying the data."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+class OutputWriter:
+    """Writes frames to a file descriptor on a background thread, so that
+    slow output does not block the thread producing the frames.
+
+    Frames are passed through a queue of one. If a new frame is submitted
+    before the previous one has been taken for writing, the previous one is
+    dropped. As frames only contain the changes since the frame before them,
+    the producer must draw the areas of a dropped frame again, see
+    `discard_pending`.
+
+    If a write fails, e.g. as the terminal was closed, the writer thread
+    stops and the error is raised to the producer by the next `submit`,
+    `flush` or `stop`.
+    """
+
+    def __init__(self, fd: int) -> None:
+        self._fd = fd
+        self._condition = Condition()
+        self._pending: Tuple[bytes, List[Rect]] | None = None
+        self._is_writing = False
+        self._is_running = False
+        self._thread: Thread | None = None
+        # The error the writer thread stopped on, until it is raised.
+        self._error: OSError | None = None
+
+    def start(self) -> None:
+        """Starts the writer thread."""
+        with self._condition:
+            if self._is_running:
+                return
+            self._is_running = True
+
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Writes the pending frame, if any, and stops the writer thread.
+
+        Raises:
+            OSError: If the writer thread stopped on a failed write.
+        """
+        with self._condition:
+            self._is_running = False
+            self._condition.notify_all()
+
+        # The thread may have stopped on its own, on a failed write.
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._condition:
+            self._raise_error()
+
+    def submit(self, frame: bytes, rects: List[Rect]) -> None:
+        """Queues a frame for writing, replacing the pending frame, if any.
+
+        Args:
+            frame (bytes): The output to write.
+            rects (List[Rect]): The screen areas the frame draws to.
+
+        Raises:
+            OSError: If the writer thread stopped on a failed write. The frame
+            is not queued.
+        """
+        with self._condition:
+            self._raise_error()
+            self._pending = (frame, rects)
+            self._condition.notify_all()
+
+    def discard_pending(self) -> List[Rect] | None:
+        """Drops the pending frame if it has not been taken for writing yet.
+
+        Returns:
+            List[Rect] | None: The screen areas the dropped frame would have
+            drawn to, or None if there was no pending frame.
+        """
+        with self._condition:
+            if self._pending is None:
+                return None
+            _, rects = self._pending
+            self._pending = None
+            return rects
+
+    def flush(self) -> None:
+        """Blocks until the pending frame has been written.
+
+        Raises:
+            OSError: If the writer thread stopped on a failed write.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: ((self._pending is None and not self._is_writing)
+                         or not self._is_running)
+            )
+            self._raise_error()
+
+    def _raise_error(self) -> None:
+        """Raises the error the writer thread stopped on, once. Called with
+        the condition held."""
+        error = self._error
+        if error is not None:
+            self._error = None
+            raise error
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._pending is not None or not self._is_running
+                )
+                if self._pending is None:
+                    return
+                frame, _ = self._pending
+                self._pending = None
+                self._is_writing = True
+
+            try:
+                write_all(self._fd, frame)
+            except OSError as error:
+                # The thread stops, so that waiting for it never blocks
+                # forever, and the producer is told through the error.
+                with self._condition:
+                    self._error = error
+                    self._is_running = False
+                    self._pending = None
+                return
+            finally:
+                with self._condition:
+                    self._is_writing = False
+                    self._condition.notify_all()
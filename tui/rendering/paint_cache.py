@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from sys import getsizeof
+from typing import Callable, Hashable, Tuple
+from weakref import WeakValueDictionary
+
+from .framebuffer import Fill, Text
+
+
+class Paint:
+    """The paint operations of a component, relative to its position."""
+
+    __slots__ = ("operations", "size", "__weakref__")
+
+    def __init__(self, operations: Tuple[Fill | Text, ...]) -> None:
+        self.operations = operations
+        # An estimate of the memory used by the operations, in bytes.
+        self.size = getsizeof(operations) + sum(
+            getsizeof(op) + (op.chars.nbytes if isinstance(op, Text) else 0)
+            for op in operations
+        )
+
+
+class PaintCache:
+    """Paint shared by the components that look the same.
+
+    Paint is kept for as long as a component uses it. Optionally, the most
+    recently used paint is kept also after no component uses it anymore, up
+    to `max_bytes` in total, so that components changing back to how they
+    looked before, e.g. when losing focus, need not be painted again.
+    """
+
+    def __init__(self, max_bytes: int | None = None) -> None:
+        """
+        Args:
+            max_bytes (int | None): The total size of the most recently used
+            paint to keep. If None, paint is kept only while it is used.
+        """
+        self._max_bytes = max_bytes
+        self._shared: WeakValueDictionary[Hashable, Paint] = WeakValueDictionary()
+        self._recent: OrderedDict[Hashable, Paint] = OrderedDict()
+        self._recent_bytes = 0
+
+    def get(self, key: Hashable, create: Callable[[], Paint]) -> Paint:
+        """Returns the paint for `key`, created with `create` if there is
+        none."""
+        paint = self._shared.get(key)
+        if paint is None:
+            paint = create()
+            self._shared[key] = paint
+
+        if self._max_bytes is not None:
+            self._use(key, paint)
+        return paint
+
+    def _use(self, key: Hashable, paint: Paint) -> None:
+        if key in self._recent:
+            self._recent.move_to_end(key)
+            return
+
+        self._recent[key] = paint
+        self._recent_bytes += paint.size
+        while self._recent_bytes > self._max_bytes and self._recent:
+            _, evicted = self._recent.popitem(last=False)
+            self._recent_bytes -= evicted.size
+
+    def __len__(self) -> int:
+        return len(self._shared)
@@ -0,0 +1,78 @@
+from typing import Dict, Generic, Hashable, Iterable, Set, Tuple, TypeVar
+
+from ..rect import Rect
+
+K = TypeVar("K", bound=Hashable)
+
+
+class RectIndex(Generic[K]):
+    """Finds the keys whose rectangles overlap an area.
+
+    The screen is divided into cells of `cell_width` by `cell_height`, and
+    each key is kept in the cells its rectangle overlaps, so that finding the
+    keys overlapping a small area looks only at a few cells, however many
+    keys there are.
+    """
+
+    def __init__(self, cell_width: int = 16, cell_height: int = 4) -> None:
+        self._cell_width = cell_width
+        self._cell_height = cell_height
+        self._cells: Dict[Tuple[int, int], Set[K]] = {}
+        self._rects: Dict[K, Rect] = {}
+
+    def _get_cells(self, rect: Rect) -> Iterable[Tuple[int, int]]:
+        x0 = rect.x // self._cell_width
+        x1 = (rect.right - 1) // self._cell_width
+        y0 = rect.y // self._cell_height
+        y1 = (rect.bottom - 1) // self._cell_height
+        return ((x, y) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1))
+
+    def set(self, key: K, rect: Rect) -> None:
+        """Sets the rectangle of `key`, replacing the one it had."""
+        if self._rects.get(key) == rect:
+            return
+        self.discard(key)
+        if rect.is_empty():
+            return
+
+        self._rects[key] = rect
+        for cell in self._get_cells(rect):
+            keys = self._cells.get(cell)
+            if keys is None:
+                keys = self._cells[cell] = set()
+            keys.add(key)
+
+    def discard(self, key: K) -> None:
+        """Drops `key` if it is in the index."""
+        rect = self._rects.pop(key, None)
+        if rect is None:
+            return
+
+        for cell in self._get_cells(rect):
+            keys = self._cells[cell]
+            keys.discard(key)
+            if not keys:
+                del self._cells[cell]
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._rects.clear()
+
+    def query(self, rects: Iterable[Rect]) -> Set[K]:
+        """Returns the keys whose rectangles overlap any of `rects`."""
+        found: Set[K] = set()
+        key_rects = self._rects
+        for rect in rects:
+            if rect.is_empty():
+                continue
+            # Same as `Rect.intersects`, without the properties, as many keys
+            # may be tested.
+            x, y, right, bottom = rect.x, rect.y, rect.right, rect.bottom
+            for cell in self._get_cells(rect):
+                for key in self._cells.get(cell, ()):
+                    if key in found:
+                        continue
+                    kx, ky, width, height = key_rects[key]
+                    if kx < right and x < kx + width and ky < bottom and y < ky + height:
+                        found.add(key)
+        return found
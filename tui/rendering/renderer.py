@@ -1,117 +1,347 @@
 from time import time
 from abc import ABC, abstractmethod
-from io import StringIO
 from sys import stdout
+from typing import Iterable, List, Tuple
+from weakref import WeakKeyDictionary
+
 from blessed import Terminal
-from typing import Dict
 
-from ..color import RGBA
 from ..utils.logger import log
 from ..components.component_tree import ComponentTree
 from ..components.component import Component
+from ..components.component_style import ResolvedStyle
+from ..color import RGBA
+from ..style_resolver.result_store import ComponentResultStore, ResultStore
+from ..rect import Rect, merge_rects
+from .framebuffer import FrameBuffer, Fill, Text, encode_text
+from .encoder import OutputEncoder
+from .paint_cache import Paint, PaintCache
+from .rect_index import RectIndex
+from .output_writer import OutputWriter, write_all
 
 
 class Renderer(ABC):
     @abstractmethod
-    def render(self, tree: ComponentTree):
+    def render(self,
+               tree: ComponentTree,
+               damage: List[Rect] | None = None,
+               store: ResultStore | None = None,
+               dirty: Iterable[Component] | None = None):
         pass
 
     def draw(self):
         pass
 
+    def forget(self, component: Component):
+        """Drops what is kept for rendering a component, e.g. when it leaves
+        the tree."""
+
+    def close(self):
+        pass
+
+
+# Begin and end synchronized update (DEC private mode 2026). Terminals
+# supporting the mode show the output between these at once, and others
+# ignore them.
+_BEGIN_SYNC = b"\x1b[?2026h"
+_END_SYNC = b"\x1b[?2026l"
+
+RGBAValues = Tuple[int, int, int, float]
+# What a component looks like: its width, height, background color, color
+# and text.
+PaintKey = Tuple[int, int, RGBAValues, RGBAValues, str]
+
 
 class TerminalRenderer(Renderer):
-    def __init__(self, term: Terminal) -> None:
+    def __init__(self,
+                 term: Terminal,
+                 threaded_output: bool = False,
+                 synchronized_output: bool = False,
+                 max_cache_bytes: int | None = None) -> None:
+        """
+        Args:
+            term (Terminal): The terminal to render to.
+            threaded_output (bool): Whether to write frames on a background
+            thread, so that slow output does not block drawing. A frame not
+            yet written when the next one is drawn is dropped.
+            synchronized_output (bool): Whether to wrap frames in synchronized
+            updates, so that terminals show each frame at once instead of
+            partially drawn.
+            max_cache_bytes (int | None): How many bytes of paint no longer
+            used by any component to keep for reuse, see `PaintCache`.
+        """
         self._term = term
-        self._screen_buffer = StringIO()
-        self._cache: Dict[int, StringIO] = {}
-        self._bg_color_cache: Dict[RGBA, str] = {}
-        self._fg_color_cache: Dict[RGBA, str] = {}
-
-    def _get_color(self, color: RGBA):
-        # NOTE: using `setdefault` would be cleaner, but with it the slow
-        # color function would be ran even if the color is cached.
-        c = self._fg_color_cache.get(color, None)
-        if c is None:
-            c = str(self._term.color_rgb(color.r, color.g, color.b))
-            self._fg_color_cache[color] = c
-
-        return c
-
-    def _get_bg_color(self, bg_color: RGBA):
-        c = self._bg_color_cache.get(bg_color, None)
-        if c is None:
-            c = str(self._term.on_color_rgb(
-                bg_color.r, bg_color.g, bg_color.b))
-            self._bg_color_cache[bg_color] = c
-
-        return c
-
-    def _render_bg(self, component: Component) -> None:
-        style = component.resolved_style
-        if style.background_color.a == 0:
-            return
+        # Frames are encoded into this buffer, which is reused between frames.
+        self._screen_buffer = bytearray()
+        self._synchronized_output = synchronized_output
+        self._writer = (OutputWriter(stdout.fileno())
+                        if threaded_output else None)
+
+        # Components are painted into `_back`. `_front` holds what has been
+        # drawn to the terminal, so that only the differing cells are drawn.
+        self._back = FrameBuffer()
+        self._front = FrameBuffer()
+        # The areas repainted by the latest `render`, to be drawn by `draw`.
+        self._damage: List[Rect] = []
+
+        # The paint of components that look the same, shared between them
+        # and keyed by `_get_paint_key`.
+        self._paint_cache = PaintCache(max_cache_bytes)
+        # The area and the shared paint of each component, reused until the
+        # component becomes dirty. Entries are dropped along with their
+        # components.
+        self._cache: WeakKeyDictionary[Component, Tuple[Rect, Paint]] = (
+            WeakKeyDictionary()
+        )
+        # The cached components by the areas they cover on screen, for
+        # finding the components to repaint in the damaged areas.
+        self._index: RectIndex[Component] = RectIndex()
+        self._encoder = OutputEncoder(term)
+        self._component_store = ComponentResultStore()
+
+    @staticmethod
+    def _get_paint_key(style: ResolvedStyle) -> PaintKey:
+        bg = style.background_color
+        fg = style.color
+        return (style.width,
+                style.height,
+                (bg.r, bg.g, bg.b, bg.a),
+                (fg.r, fg.g, fg.b, fg.a),
+                style.text[:style.width] if style.text else "")
 
-        bg_color = self._get_bg_color(style.background_color)
+    def _get_paint(self, style: ResolvedStyle) -> Paint:
+        """Returns the paint of a component with the resolved `style`, shared
+        with every component that looks the same."""
+        key = self._get_paint_key(style)
+        return self._paint_cache.get(key, lambda: self._create_paint(*key))
 
-        x, y = style.x, style.y
-        w, h = style.width, style.height
+    def _create_paint(self,
+                      width: int,
+                      height: int,
+                      bg: RGBAValues,
+                      fg: RGBAValues,
+                      text: str) -> Paint:
+        return Paint(tuple(op for op in (self._render_bg(width, height, bg),
+                                         self._render_text(text, fg))
+                           if op is not None))
 
-        row = bg_color + " " * w + "\x1b[m"
-        for i in range(h):
-            c = self._term.move_xy(x, y+i) + row
-            self._screen_buffer.write(c)
-            self._cache[id(component)].write(c)
+    @staticmethod
+    def _render_bg(width: int, height: int, color: RGBAValues) -> Fill | None:
+        if color[3] == 0:
+            return None
 
-    def _render_text(self, component: Component) -> None:
-        text = component.text
-        style = component.resolved_style
+        # Translucent backgrounds are blended over whatever is beneath when
+        # the operation is painted into the frame buffer. The color is copied,
+        # as the operation may outlive the style it came from.
+        return Fill(width, height, RGBA(*color))
 
+    @staticmethod
+    def _render_text(text: str, color: RGBAValues) -> Text | None:
+        # Text is clipped to the component's width, see `_get_paint_key`, so
+        # that the component never paints outside of its area.
         if not text:
-            return
+            return None
+
+        return Text(encode_text(text), RGBA(*color))
 
-        x, y = style.x, style.y
+    @staticmethod
+    def _get_rect(style: ResolvedStyle) -> Rect:
+        return Rect(style.x, style.y, style.width, style.height)
 
-        fg_color = self._get_color(style.color)
-        bg_color = self._get_bg_color(style.background_color)
+    def _resize(self, width: int, height: int) -> None:
+        self._back.resize(width, height)
+        self._front.resize(width, height)
+        self._front.invalidate()
+        self._encoder.reset()
 
-        content = bg_color + fg_color + \
-            self._term.move_xy(x, y) + text + "\x1b[m"
-        self._screen_buffer.write(content)
-        self._cache[id(component)].write(content)
+    def render(self,
+               tree: ComponentTree,
+               damage: List[Rect] | None = None,
+               store: ResultStore | None = None,
+               dirty: Iterable[Component] | None = None) -> None:
+        """Paints the components of `tree` into the back buffer.
 
-    def render(self, tree: ComponentTree) -> None:
+        Args:
+            tree (ComponentTree): The tree to render.
+            damage (List[Rect] | None): The screen areas to repaint, e.g.
+            `StyleResolver.damage`. Components are painted only where they
+            overlap these areas. If None, the whole screen is repainted.
+            store (ResultStore | None): The resolved styles to render, e.g.
+            `StyleResolver.store`. If None, the styles resolved into the
+            components themselves are rendered.
+            dirty (Iterable[Component] | None): The components whose resolved
+            styles changed, e.g. `StyleResolver.dirty`. If given along with
+            `damage`, only these and the components overlapping the damaged
+            areas are visited. Otherwise every component is.
+        """
         s = time()
         render_count = 0
-        self._screen_buffer.seek(0)
+        if store is None:
+            store = self._component_store
 
-        for node in tree.traverse():
-            component = node.component
-            cache = self._cache.setdefault(id(component), StringIO())
+        if self._fit_to_screen(store.get_resolved_style(tree.root.component)):
+            damage = None
 
-            if component.dirty is True:
-                render_count += 1
+        screen = self._back.rect
+        if damage is None:
+            rects = [screen]
+        else:
+            rects = [r for r in (d.intersection(screen)
+                                 for d in merge_rects(damage))
+                     if r is not None]
+        self._damage = rects
+
+        for rect in rects:
+            self._back.clear(rect)
 
-                cache.seek(0)
-                self._render_bg(component)
-                self._render_text(component)
-                cache.truncate()
+        # Without damage every component is visited, see
+        # `_get_components_to_paint`.
+        for component in self._get_components_to_paint(
+                tree, rects, dirty if damage is not None else None):
+            cached = self._cache.get(component)
 
-            self._screen_buffer.write(cache.getvalue())
-            component.dirty = False
+            if cached is None or store.is_dirty(component):
+                cached = self._cache_component(component, store, screen)
+                if cached is None:
+                    continue
+                render_count += 1
 
-        self._screen_buffer.truncate()
-        self._screen_buffer.flush()
+            self._paint(*cached, rects)
 
         e = time()
         log(f"{render_count} components rendered in {e-s} seconds")
 
+    def _fit_to_screen(self, root_style: ResolvedStyle) -> bool:
+        """Resizes the buffers to the screen given by the resolved style of
+        the root, if its size changed. Returns whether it did."""
+        width = root_style.x + root_style.width
+        height = root_style.y + root_style.height
+        if width == self._back.width and height == self._back.height:
+            return False
+        self._resize(width, height)
+        return True
+
+    def _paint(self, bounds: Rect, paint: Paint, rects: List[Rect]) -> None:
+        """Paints a component at `bounds`, only where it overlaps `rects`, so
+        that components painted earlier are overwritten only there."""
+        for rect in rects:
+            if rect.intersects(bounds):
+                for operation in paint.operations:
+                    operation.paint(self._back, bounds.x, bounds.y, rect)
+
+    def _cache_component(self,
+                         component: Component,
+                         store: ResultStore,
+                         screen: Rect) -> Tuple[Rect, Paint] | None:
+        """Caches the area and paint of `component` from its resolved style,
+        and returns them, or None if it is out of view."""
+        style = store.get_resolved_style(component)
+        # Components out of view are neither painted nor cached. Their styles
+        # may not even be resolved, see `StyleResolver`.
+        bounds = self._get_rect(style) if style is not None else None
+        visible = bounds.intersection(screen) if bounds is not None else None
+        if visible is None:
+            self._cache.pop(component, None)
+            self._index.discard(component)
+            return None
+
+        cached = (bounds, self._get_paint(style))
+        self._cache[component] = cached
+        self._index.set(component, visible)
+        store.set_dirty(component, False)
+        return cached
+
+    def _get_components_to_paint(self,
+                                 tree: ComponentTree,
+                                 rects: List[Rect],
+                                 dirty: Iterable[Component] | None
+                                 ) -> Iterable[Component]:
+        """Returns the components to visit for repainting `rects`, in the
+        order they are painted in: the dirty components and those painted
+        over the damaged areas, or every component if `dirty` is None."""
+        if dirty is None:
+            # The cached areas are indexed again, as the screen may have been
+            # resized.
+            screen = self._back.rect
+            self._index.clear()
+            for component, (bounds, _) in self._cache.items():
+                visible = bounds.intersection(screen)
+                if visible is not None:
+                    self._index.set(component, visible)
+            return tree.traverse_components()
+
+        components = self._index.query(rects)
+        components.update(dirty)
+
+        ordered = []
+        for component in components:
+            index = tree.get_preorder_index(component)
+            if index is None:
+                # Left the tree without the renderer being told, see `forget`.
+                self._cache.pop(component, None)
+                self._index.discard(component)
+            else:
+                ordered.append((index, component))
+        ordered.sort(key=lambda item: item[0])
+        return [component for _, component in ordered]
+
+    def forget(self, component: Component) -> None:
+        # The area the component covered is repainted through the damage of
+        # the resolution after its removal.
+        self._cache.pop(component, None)
+        self._index.discard(component)
+
+    def _redraw_stale_frame(self) -> None:
+        """Drops the frame waiting in the output writer, if any. The areas
+        it would have drawn are drawn again with the next frame."""
+        stale = self._writer.discard_pending()
+        if stale is None:
+            return
+
+        for rect in stale:
+            self._front.invalidate(rect)
+        self._damage = merge_rects(self._damage + stale)
+        # The cursor was left where the previous written frame left it.
+        self._encoder.reset()
+
     def draw(self) -> None:
         s = time()
 
-        self._screen_buffer.seek(0)
-        stdout.write(self._screen_buffer.read())
+        if self._writer is not None:
+            self._redraw_stale_frame()
+
+        frame = self._screen_buffer
+        frame.clear()
+        if self._synchronized_output:
+            frame += _BEGIN_SYNC
+
+        runs = self._back.diff(self._front,
+                               self._damage,
+                               self._encoder.MAX_GAP)
+        self._encoder.encode(runs, frame, self._back.width)
+
+        if self._synchronized_output:
+            if len(frame) == len(_BEGIN_SYNC):
+                frame.clear()
+            else:
+                frame += _END_SYNC
+
+        # Frames are written directly to the file descriptor, after anything
+        # written to `stdout` before them.
         stdout.flush()
+        if self._writer is not None:
+            # The buffer is reused for the next frame while the writer
+            # thread may still be writing this one.
+            self._writer.start()
+            self._writer.submit(bytes(frame), self._damage)
+        elif frame:
+            write_all(stdout.fileno(), frame)
+        self._damage = []
 
         e = time()
         log(f"Drawing took {e-s} seconds\n")
+
+    def close(self) -> None:
+        """Writes the remaining output and stops the output thread."""
+        if self._writer is not None:
+            self._writer.stop()
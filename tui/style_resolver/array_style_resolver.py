@@ -0,0 +1,438 @@
+from __future__ import annotations
+from math import isnan
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from ..components.component import Component
+from ..components.component_tree import ComponentTree, ComponentTreeNode
+from ..components.component_style import Unit
+from ..viewport import Viewport
+from .style_resolver import StyleResolver
+from .result_store import ResultStore
+from .units import Position, Size
+
+# Kinds of position values.
+_POS_NONE, _POS_OFFSET, _POS_FRACTION = 0, 1, 2
+# Kinds of size values. Sizes given as strings resolve to 0 when the parent
+# has no size.
+_SIZE_NONE, _SIZE_NUMBER, _SIZE_STR_FRACTION, _SIZE_STR_NUMBER = 0, 1, 2, 3
+
+
+def _position_spec(value: Unit) -> Tuple[int, float]:
+    if value is None:
+        return _POS_NONE, np.nan
+    position = Position.of(value)
+    return (_POS_FRACTION if position.is_fraction else _POS_OFFSET,
+            position.number)
+
+
+def _size_spec(value: Unit) -> Tuple[int, float]:
+    if value is None:
+        return _SIZE_NONE, np.nan
+    size = Size.of(value)
+    if not size.is_str:
+        return _SIZE_NUMBER, size.number
+    return (_SIZE_STR_FRACTION if size.is_fraction else _SIZE_STR_NUMBER,
+            size.number)
+
+
+def _resolve_positions(kind: np.ndarray,
+                       number: np.ndarray,
+                       reference_pos: np.ndarray,
+                       reference_size: np.ndarray) -> np.ndarray:
+    return np.select(
+        [kind == _POS_OFFSET, kind == _POS_FRACTION],
+        [np.trunc(reference_pos + number),
+         np.trunc(reference_pos + reference_size * number)],
+        np.nan
+    )
+
+
+def _resolve_sizes(kind: np.ndarray,
+                   number: np.ndarray,
+                   parent_size: np.ndarray) -> np.ndarray:
+    no_parent_size = np.isnan(parent_size) | (parent_size == 0)
+    return np.select(
+        [kind == _SIZE_NUMBER,
+         (kind >= _SIZE_STR_FRACTION) & no_parent_size,
+         kind == _SIZE_STR_FRACTION,
+         kind == _SIZE_STR_NUMBER],
+        [np.trunc(number),
+         0,
+         np.trunc(parent_size * number),
+         np.trunc(number)],
+        np.nan
+    )
+
+
+def _clamp(min_value: np.ndarray,
+           value: np.ndarray,
+           max_value: np.ndarray) -> np.ndarray:
+    return np.minimum(np.maximum(min_value, value), max_value)
+
+
+def _to_value(value: float) -> Unit:
+    """Converts a resolved value back from an array element. Missing values
+    are stored as NaN."""
+    if isnan(value):
+        return None
+    if value.is_integer():
+        return int(value)
+    return value
+
+
+class ArrayStyleResolver(StyleResolver):
+    """A style resolver that resolves the whole tree at once, using NumPy.
+
+    The tree is flattened into arrays, with a node's parent given by its
+    index in the arrays. Each pass runs over the tree level by level, with
+    the nodes of a level resolved together by array operations. The
+    resolved values are written into the resolved styles only for the
+    components whose values changed.
+
+    The results are the same as `StyleResolver`'s. This resolver suits trees
+    whose layout changes as a whole, e.g. on every resize, while
+    `StyleResolver` suits trees that change a few nodes at a time.
+    """
+
+    def __init__(self,
+                 tree: ComponentTree,
+                 viewport: Viewport,
+                 store: ResultStore | None = None,
+                 cull: bool = True) -> None:
+        super().__init__(tree, viewport, store, cull)
+
+        # The nodes in pre-order, and each node's index in them.
+        self._nodes: List[ComponentTreeNode] = []
+        self._index: Dict[Component, int] = {}
+        # The children each node had when the tree was flattened.
+        self._children: List[List[ComponentTreeNode]] = []
+        self._parent = np.empty(0, dtype=np.intp)
+        # The indices of the nodes on each level of the tree, siblings next
+        # to each other in order.
+        self._levels: List[np.ndarray] = []
+
+        # The values of the styles, see `_set_style_values`.
+        self._style_values = np.empty((0, 0))
+        self._is_relative = np.empty(0, dtype=bool)
+        self._is_absolute = np.empty(0, dtype=bool)
+        self._layout_x = np.empty(0, dtype=bool)
+        self._layout_y = np.empty(0, dtype=bool)
+
+        # The values written into the resolved styles by the latest
+        # resolution: x, y, width, height, min width and min height.
+        self._resolved_values: np.ndarray | None = None
+
+    def _needs_flattening(self, invalid: Set[Component]) -> bool:
+        if not self._nodes or self._nodes[0] is not self._tree.root:
+            return True
+
+        for component in invalid:
+            i = self._index.get(component)
+            if i is not None and self._nodes[i].children != self._children[i]:
+                return True
+        return False
+
+    def _flatten(self) -> None:
+        """Flattens the tree into arrays. The areas of components no longer
+        in the tree are recorded as damaged."""
+        nodes = []
+        parents = []
+        depths = []
+        stack = [(self._tree.root, -1, 0)]
+        while stack:
+            node, parent, depth = stack.pop()
+            parents.append(parent)
+            depths.append(depth)
+            stack.extend((child, len(nodes), depth + 1)
+                         for child in reversed(node.children))
+            nodes.append(node)
+
+        index = {node.component: i for i, node in enumerate(nodes)}
+        self._damage_restructured(nodes, index)
+
+        self._nodes = nodes
+        self._index = index
+        self._children = [list(node.children) for node in nodes]
+        self._parent = np.array(parents, dtype=np.intp)
+
+        depths = np.array(depths)
+        order = np.argsort(depths, kind="stable")
+        self._levels = np.split(order,
+                                np.cumsum(np.bincount(depths))[:-1])
+
+        n = len(nodes)
+        self._style_values = np.empty((12, n))
+        self._is_relative = np.empty(n, dtype=bool)
+        self._is_absolute = np.empty(n, dtype=bool)
+        self._layout_x = np.empty(n, dtype=bool)
+        self._layout_y = np.empty(n, dtype=bool)
+        for i in range(n):
+            self._set_style_values(i)
+        self._resolved_values = None
+
+    def _damage_restructured(self,
+                             nodes: List[ComponentTreeNode],
+                             index: Dict[Component, int]) -> None:
+        """Records the areas changed by flattening the tree into `nodes`,
+        compared to the nodes flattened before: those of components no
+        longer in the tree, and of components drawn in a new order."""
+        # Components reordered among their siblings, or moved to another
+        # parent, are drawn in a new order even if their areas are the same.
+        for node in nodes:
+            i = self._index.get(node.component)
+            if i is None:
+                for child in node.children:
+                    if child.component in self._index:
+                        self._damage_subtree(child)
+            elif self._nodes[i] is node and node.children != self._children[i]:
+                previous = self._children[i]
+                self._damage_reordered(previous, node.children)
+                previous_children = set(previous)
+                for child in node.children:
+                    if (child not in previous_children
+                            and child.component in self._index):
+                        self._damage_subtree(child)
+
+        for component in self._index:
+            if component in index:
+                continue
+            self._deferred.discard(component)
+            style = self._store.get_resolved_style(component)
+            if style is not None:
+                self._removed_rects.append(self._get_rect(style))
+
+    def _set_style_values(self, i: int) -> None:
+        """Stores the values of the style of the `i`th node into the arrays."""
+        component = self._nodes[i].component
+        style = component.style
+        text = component.text
+
+        self._style_values[:, i] = (
+            *_position_spec(style.x),
+            *_position_spec(style.y),
+            *_size_spec(style.width),
+            *_size_spec(style.height),
+            style.min_width if style.min_width is not None else len(text),
+            style.min_height if style.min_height is not None
+            else (1 if text else 0),
+            style.max_width if style.max_width is not None else np.inf,
+            style.max_height if style.max_height is not None else np.inf,
+        )
+        self._is_relative[i] = style.position == "relative"
+        self._is_absolute[i] = style.position == "absolute"
+        self._layout_x[i] = style.layout_direction == "x"
+        self._layout_y[i] = style.layout_direction == "y"
+
+    def _resolve_initial_values(self) -> Tuple[np.ndarray, ...]:
+        """Resolves initial positions and sizes, level by level from the
+        root down."""
+        # The rows of the style values are named, one per kind and number of
+        # each value, rather than indexed throughout.
+        # pylint: disable=too-many-locals
+        (x_kind, x_number, y_kind, y_number,
+         w_kind, w_number, h_kind, h_number) = self._style_values[:8]
+        parent = self._parent
+
+        n = len(self._nodes)
+        x, y, width, height = (np.empty(n) for _ in range(4))
+        # The root's values are inherited from the viewport.
+        x[0], y[0] = self._viewport.x, self._viewport.y
+        width[0], height[0] = self._viewport.width, self._viewport.height
+
+        for level in self._levels[1:]:
+            p = parent[level]
+            x[level] = _resolve_positions(x_kind[level], x_number[level],
+                                          x[p], width[p])
+            y[level] = _resolve_positions(y_kind[level], y_number[level],
+                                          y[p], height[p])
+            width[level] = _resolve_sizes(w_kind[level], w_number[level],
+                                          width[p])
+            height[level] = _resolve_sizes(h_kind[level], h_number[level],
+                                           height[p])
+
+            # Absolutely positioned components are placed at 0 by default.
+            absolute = self._is_absolute[level]
+            x[level] = np.where(absolute & np.isnan(x[level]), 0, x[level])
+            y[level] = np.where(absolute & np.isnan(y[level]), 0, y[level])
+
+        return x, y, width, height
+
+    def _resolve_sizes(self,
+                       initial_width: np.ndarray,
+                       initial_height: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """Adjusts sizes to the children and to the size restrictions, level
+        by level from the leaves up, and then fits the children's sizes
+        within their parents'."""
+        width, height, required = self._adjust_to_children(initial_width,
+                                                           initial_height)
+        self._fit_to_parents(width, height, *required)
+        return width, height
+
+    def _adjust_to_children(self,
+                            initial_width: np.ndarray,
+                            initial_height: np.ndarray
+                            ) -> Tuple[np.ndarray, ...]:
+        """Adjusts sizes to the children and to the size restrictions, level
+        by level from the leaves up. Returns the adjusted sizes, and the
+        sizes each node requires for its relatively positioned children."""
+        min_width, min_height, max_width, max_height = self._style_values[8:]
+
+        n = len(self._nodes)
+        # The sums and maximums of the relatively positioned children's
+        # adjusted widths and heights.
+        children = np.zeros((4, n))
+        width, height = np.empty(n), np.empty(n)
+
+        for level in reversed(self._levels):
+            required_width, required_height = self._get_required_sizes(
+                children[:, level], level
+            )
+            width[level] = _clamp(min_width[level],
+                                  np.where(np.isnan(initial_width[level]),
+                                           required_width,
+                                           initial_width[level]),
+                                  max_width[level])
+            height[level] = _clamp(min_height[level],
+                                   np.where(np.isnan(initial_height[level]),
+                                            required_height,
+                                            initial_height[level]),
+                                   max_height[level])
+
+            relative = level[self._is_relative[level]]
+            if level is not self._levels[0] and relative.size != 0:
+                self._reduce_children(children, width, height, relative)
+
+        return width, height, self._get_required_sizes(children, slice(None))
+
+    def _reduce_children(self,
+                         children: np.ndarray,
+                         width: np.ndarray,
+                         height: np.ndarray,
+                         relative: np.ndarray) -> None:
+        """Stores the sums and maximums of the sizes of the `relative` nodes
+        of a level into `children`, at their parents."""
+        # Siblings are next to each other, so every parent's children are
+        # reduced together.
+        p = self._parent[relative]
+        starts = np.flatnonzero(np.r_[True, p[1:] != p[:-1]])
+        p = p[starts]
+        children[0, p] = np.add.reduceat(width[relative], starts)
+        children[1, p] = np.add.reduceat(height[relative], starts)
+        children[2, p] = np.maximum(
+            0, np.maximum.reduceat(width[relative], starts)
+        )
+        children[3, p] = np.maximum(
+            0, np.maximum.reduceat(height[relative], starts)
+        )
+
+    def _get_required_sizes(self,
+                            children: np.ndarray,
+                            nodes: np.ndarray | slice) -> Tuple[np.ndarray, ...]:
+        """Returns the widths and heights `nodes` require for their
+        relatively positioned children, given the sums and maximums of the
+        children's sizes, see `_adjust_to_children`."""
+        sum_width, sum_height, most_width, most_height = children
+        return (np.where(self._layout_x[nodes], sum_width, most_width),
+                np.where(self._layout_y[nodes], sum_height, most_height))
+
+    def _fit_to_parents(self,
+                        width: np.ndarray,
+                        height: np.ndarray,
+                        required_width: np.ndarray,
+                        required_height: np.ndarray) -> None:
+        """Restricts children's sizes to their parents' adjusted sizes in
+        place, scaling them down to retain their relative sizes."""
+        min_width, min_height, max_width, max_height = self._style_values[8:]
+        p = self._parent[1:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fit_width = np.trunc(_clamp(
+                min_width[1:],
+                (width[p] / required_width[p]) * width[1:],
+                max_width[1:]
+            ))
+            fit_height = np.trunc(_clamp(
+                min_height[1:],
+                (height[p] / required_height[p]) * height[1:],
+                max_height[1:]
+            ))
+        width[1:] = np.where(required_width[p] > width[p],
+                             fit_width, width[1:])
+        height[1:] = np.where(required_height[p] > height[p],
+                              fit_height, height[1:])
+
+    def _lay_out(self,
+                 x: np.ndarray,
+                 y: np.ndarray,
+                 width: np.ndarray,
+                 height: np.ndarray) -> None:
+        """Lays out the relatively positioned children of every node one
+        after another, level by level from the root down. Other nodes keep
+        their initial positions."""
+        for level in self._levels[1:]:
+            relative = level[self._is_relative[level]]
+            if relative.size == 0:
+                continue
+
+            p = self._parent[relative]
+            is_start = np.r_[True, p[1:] != p[:-1]]
+            group = np.cumsum(is_start) - 1
+            for pos, size, along in ((x, width, self._layout_x),
+                                     (y, height, self._layout_y)):
+                # The sum of the sizes of the preceding siblings.
+                sizes = size[relative]
+                preceding = np.cumsum(sizes) - sizes
+                preceding -= preceding[is_start][group]
+                pos[relative] = np.where(along[p], pos[p] + preceding, pos[p])
+
+    def _get_layout_values(self, component: Component) -> Tuple | None:
+        i = self._index.get(component)
+        if i is None or self._resolved_values is None:
+            return None
+        return tuple(map(_to_value, self._resolved_values[:, i].tolist()))
+
+    def _get_changed(self,
+                     values: np.ndarray,
+                     invalid: Set[Component]) -> np.ndarray:
+        """Returns the indices of the nodes whose resolved `values` differ
+        from those of the latest resolution, or whose styles changed."""
+        if self._resolved_values is None:
+            return np.arange(len(self._nodes))
+
+        previous = self._resolved_values
+        differs = ((values != previous)
+                   & ~(np.isnan(values) & np.isnan(previous)))
+        changed = np.flatnonzero(differs.any(axis=0))
+        if invalid:
+            # Components whose styles changed have their resolved styles
+            # updated even if their positions and sizes did not change.
+            changed = np.union1d(
+                changed,
+                [self._index[c] for c in invalid if c in self._index]
+            ).astype(np.intp)
+        return changed
+
+    @StyleResolver.flag_dirty_components
+    def _resolution_pipeline(self) -> None:
+        invalid, self._invalid = self._invalid, set()
+
+        if self._needs_flattening(invalid):
+            self._flatten()
+        else:
+            for component in invalid:
+                i = self._index.get(component)
+                if i is not None:
+                    self._set_style_values(i)
+
+        x, y, initial_width, initial_height = self._resolve_initial_values()
+        width, height = self._resolve_sizes(initial_width, initial_height)
+        self._lay_out(x, y, width, height)
+
+        values = np.stack((x, y, width, height, *self._style_values[8:10]))
+        changed = self._get_changed(values, invalid)
+        self._resolved_values = values
+
+        for i, column in zip(changed.tolist(), values[:, changed].T.tolist()):
+            self._set_resolved_style(self._nodes[i].component,
+                                     *map(_to_value, column))
@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from typing import Tuple
+
+from ..components.component import Component
+from ..components.component_tree import ComponentTree
+from ..viewport import Viewport
+from .style_resolver import StyleResolver
+from .result_store import ViewportResultStore
+
+# The position and size of a viewport.
+ViewportKey = Tuple[int, int, int, int]
+
+
+class _Entry:
+    """The resolver of a viewport size, and whether the tree has changed
+    since it last resolved."""
+
+    __slots__ = ("resolver", "is_stale")
+
+    def __init__(self, resolver: StyleResolver) -> None:
+        self.resolver = resolver
+        self.is_stale = True
+
+
+class MultiViewportResolver:
+    """Resolves one tree for many viewports, e.g. for the terminals of many
+    clients sharing the tree.
+
+    The styles are resolved into a separate `ViewportResultStore` per
+    viewport position and size, leaving the components themselves
+    untouched. Viewports of the same position and size share their results,
+    so that the tree is resolved once per distinct size after each change,
+    however many viewports have that size. The dirty flags of a store are
+    cleared by the renderer rendering it, so viewports of the same size are
+    meant to share a renderer and its frames.
+    """
+
+    def __init__(self,
+                 tree: ComponentTree,
+                 resolver_class: type[StyleResolver] = StyleResolver,
+                 max_sizes: int | None = None) -> None:
+        """
+        Args:
+            tree (ComponentTree): The tree whose styles to resolve.
+            resolver_class (type[StyleResolver]): The resolver to resolve
+            each size with.
+            max_sizes (int | None): How many sizes to keep the results of. The
+            results of the least recently resolved sizes are dropped first.
+            If None, results are kept until `release` is called.
+        """
+        self._tree = tree
+        self._resolver_class = resolver_class
+        self._max_sizes = max_sizes
+        self._entries: OrderedDict[ViewportKey, _Entry] = OrderedDict()
+        tree.add_invalidation_listener(self._invalidate)
+
+    @staticmethod
+    def _get_key(viewport: Viewport) -> ViewportKey:
+        return (viewport.x, viewport.y, viewport.width, viewport.height)
+
+    def _invalidate(self, component: Component) -> None:
+        for entry in self._entries.values():
+            entry.is_stale = True
+
+    def resolve(self, viewport: Viewport) -> StyleResolver:
+        """Resolves the tree for `viewport`, unless it has been resolved for
+        the same position and size since the tree last changed.
+
+        Returns:
+            StyleResolver: The resolver of the viewport's size, whose `store`
+            holds the resolved styles and whose `damage` holds the areas
+            changed by the latest resolution.
+        """
+        key = self._get_key(viewport)
+        entry = self._entries.get(key)
+        if entry is None:
+            resolver = self._resolver_class(self._tree,
+                                            Viewport(*key),
+                                            ViewportResultStore())
+            entry = self._entries[key] = _Entry(resolver)
+            if self._max_sizes is not None:
+                while len(self._entries) > self._max_sizes:
+                    _, evicted = self._entries.popitem(last=False)
+                    evicted.resolver.close()
+        else:
+            self._entries.move_to_end(key)
+
+        if entry.is_stale:
+            entry.resolver.resolve()
+            entry.is_stale = False
+        return entry.resolver
+
+    def release(self, viewport: Viewport) -> None:
+        """Drops the results of the viewport's size, e.g. when no client has
+        that size anymore."""
+        entry = self._entries.pop(self._get_key(viewport), None)
+        if entry is not None:
+            entry.resolver.close()
+
+    def close(self) -> None:
+        """Drops the results of every size and stops following the changes to
+        the tree."""
+        for entry in self._entries.values():
+            entry.resolver.close()
+        self._entries.clear()
+        self._tree.remove_invalidation_listener(self._invalidate)
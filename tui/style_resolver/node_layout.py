@@ -0,0 +1,83 @@
+from __future__ import annotations
+from typing import Dict, Generator, List, Set
+
+from ..components.component import Component
+from ..components.component_tree import ComponentTreeNode
+
+# The value of layout values not resolved yet. Differs from every resolved
+# value, including None.
+UNRESOLVED = object()
+
+
+class NodeLayout:
+    """The layout of a component in the tree, along with the intermediate
+    values it is resolved from. These are kept between resolutions, so that
+    only the parts of the tree affected by a change need to be resolved
+    again.
+    """
+
+    __slots__ = ("node", "depth", "children", "layout_key", "is_relative",
+                 "initial_x", "initial_y", "initial_width", "initial_height",
+                 "min_width", "min_height",
+                 "required_width", "required_height",
+                 "adjusted_width", "adjusted_height",
+                 "x", "y", "width", "height")
+
+    def __init__(self, node: ComponentTreeNode, depth: int) -> None:
+        self.node = node
+        self.depth = depth
+        # The children the layout was resolved with.
+        self.children: List[ComponentTreeNode] = list(node.children)
+        # The values of the component the layout was resolved from, see
+        # `StyleResolver._get_layout_key`.
+        self.layout_key = UNRESOLVED
+        self.is_relative = UNRESOLVED
+
+        # Positions and sizes with units resolved, see `_first_pass`.
+        self.initial_x = UNRESOLVED
+        self.initial_y = UNRESOLVED
+        self.initial_width = UNRESOLVED
+        self.initial_height = UNRESOLVED
+
+        # Sizes adjusted to the children and to the size restrictions, and
+        # the sizes the children require, see `_second_pass`.
+        self.min_width = UNRESOLVED
+        self.min_height = UNRESOLVED
+        self.required_width = UNRESOLVED
+        self.required_height = UNRESOLVED
+        self.adjusted_width = UNRESOLVED
+        self.adjusted_height = UNRESOLVED
+
+        # The final position and size.
+        self.x = UNRESOLVED
+        self.y = UNRESOLVED
+        self.width = UNRESOLVED
+        self.height = UNRESOLVED
+
+
+class DepthQueue:
+    """A set of components visited in the order of their depths in the tree,
+    shallowest first, or deepest first if `deepest_first` is set. Components
+    may be added while visiting, as long as they are not added to depths
+    already visited.
+    """
+
+    def __init__(self,
+                 layouts: Dict[Component, NodeLayout],
+                 deepest_first: bool = False) -> None:
+        self._layouts = layouts
+        self._deepest_first = deepest_first
+        self._depths: Dict[int, Set[Component]] = {}
+
+    def add(self, component: Component) -> None:
+        depth = self._layouts[component].depth
+        components = self._depths.get(depth)
+        if components is None:
+            self._depths[depth] = {component}
+        else:
+            components.add(component)
+
+    def __iter__(self) -> Generator[Component, None, None]:
+        next_depth = max if self._deepest_first else min
+        while self._depths:
+            yield from self._depths.pop(next_depth(self._depths))
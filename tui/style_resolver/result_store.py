@@ -0,0 +1,80 @@
+from abc import ABC, abstractmethod
+from weakref import WeakKeyDictionary, WeakSet
+
+from ..components.component import Component
+from ..components.component_style import ResolvedStyle
+
+
+class ResultStore(ABC):
+    """Where a style resolver keeps the resolved styles of components, and
+    which of them have changed since they were last rendered."""
+
+    @abstractmethod
+    def get_resolved_style(self, component: Component) -> ResolvedStyle | None:
+        pass
+
+    @abstractmethod
+    def set_resolved_style(self,
+                           component: Component,
+                           resolved: ResolvedStyle | None) -> None:
+        """Sets the resolved style of `component`, or drops it if None."""
+
+    @abstractmethod
+    def is_dirty(self, component: Component) -> bool:
+        pass
+
+    @abstractmethod
+    def set_dirty(self, component: Component, dirty: bool) -> None:
+        pass
+
+
+class ComponentResultStore(ResultStore):
+    """Keeps the results in the components themselves, in their
+    `resolved_style` and `dirty`. Used when a tree is resolved for a single
+    viewport."""
+
+    def get_resolved_style(self, component: Component) -> ResolvedStyle | None:
+        return component.resolved_style
+
+    def set_resolved_style(self,
+                           component: Component,
+                           resolved: ResolvedStyle | None) -> None:
+        component.resolved_style = resolved
+
+    def is_dirty(self, component: Component) -> bool:
+        return component.dirty
+
+    def set_dirty(self, component: Component, dirty: bool) -> None:
+        component.dirty = dirty
+
+
+class ViewportResultStore(ResultStore):
+    """Keeps the results apart from the components, so that a tree can be
+    resolved for several viewports at once, each into its own store. The
+    results of a component are dropped along with it."""
+
+    def __init__(self) -> None:
+        self._resolved_styles: WeakKeyDictionary[Component, ResolvedStyle] = (
+            WeakKeyDictionary()
+        )
+        self._dirty: WeakSet[Component] = WeakSet()
+
+    def get_resolved_style(self, component: Component) -> ResolvedStyle | None:
+        return self._resolved_styles.get(component)
+
+    def set_resolved_style(self,
+                           component: Component,
+                           resolved: ResolvedStyle | None) -> None:
+        if resolved is None:
+            self._resolved_styles.pop(component, None)
+        else:
+            self._resolved_styles[component] = resolved
+
+    def is_dirty(self, component: Component) -> bool:
+        return component in self._dirty
+
+    def set_dirty(self, component: Component, dirty: bool) -> None:
+        if dirty:
+            self._dirty.add(component)
+        else:
+            self._dirty.discard(component)
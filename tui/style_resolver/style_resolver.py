@@ -1,262 +1,708 @@
 from __future__ import annotations
 from time import time
-from typing import List, Self, TypeVar
+from typing import Dict, List, Self, Set, Tuple, TypeVar
 from collections.abc import Callable
 from functools import wraps
-from dataclasses import replace
-from copy import copy
 
 from ..utils.logger import log
+from ..components.component import Component
 from ..components.component_tree import ComponentTree, ComponentTreeNode
+from ..components.component_style import ResolvedStyle, Style, Unit
 from ..viewport import Viewport
+from ..rect import Rect
 from .units import Position, Size, Axis
 from .resolution_utils import clamp
+from .node_layout import UNRESOLVED, DepthQueue, NodeLayout
+from .result_store import ComponentResultStore, ResultStore
 
 T = TypeVar("T")
 A = TypeVar("A")
 
 
+class _Resolution:
+    """The nodes to visit in the passes of a single resolution."""
+
+    def __init__(self, layouts: Dict[Component, NodeLayout]) -> None:
+        # Nodes whose adjusted sizes need to be computed.
+        self.adjust: Set[Component] = set()
+        # Nodes whose children's final sizes need to be computed.
+        self.refit: Set[Component] = set()
+        # Nodes whose final sizes need to be computed.
+        self.resize: Set[Component] = set()
+        # Nodes whose children need to be laid out.
+        self.relayout = DepthQueue(layouts)
+        # Nodes whose resolved styles need to be updated.
+        self.changed: Set[Component] = set()
+
+
 class StyleResolver:
-    def __init__(self, tree: ComponentTree, viewport: Viewport) -> None:
+    def __init__(self,
+                 tree: ComponentTree,
+                 viewport: Viewport,
+                 store: ResultStore | None = None,
+                 cull: bool = True) -> None:
+        """
+        Args:
+            tree (ComponentTree): The tree whose styles to resolve.
+            viewport (Viewport): The viewport to resolve the styles for.
+            store (ResultStore | None): Where to keep the resolved styles. If
+            None, they are kept in the components themselves.
+            cull (bool): Whether to defer updating the resolved styles of
+            components out of the viewport until they come into view.
+        """
         self._tree = tree
         self._viewport = viewport
+        self._store = store if store is not None else ComponentResultStore()
+
+        # Components out of view whose resolved styles are out of date, and
+        # the area in view during the latest resolution.
+        self._cull = cull
+        self._deferred: Set[Component] = set()
+        self._visible: Rect | None = None
+
+        # Screen areas changed by the latest resolution, and the components
+        # it marked dirty.
+        self._damage: List[Rect] = []
+        self._dirty: List[Component] = []
+        # The components resolved by the latest resolution, with their areas,
+        # style versions and texts before it, and the areas of components it
+        # found removed.
+        self._resolved: Dict[Component, Tuple[Rect, int, str] | None] = {}
+        self._removed_rects: List[Rect] = []
+
+        # The layouts of the components, kept between resolutions. Only the
+        # layouts of invalidated components and of the components depending
+        # on them are resolved again.
+        self._layouts: Dict[Component, NodeLayout] = {}
+        self._invalid: Set[Component] = set()
+        self._resolved_viewport: Tuple[int, int, int, int] | None = None
+        tree.add_invalidation_listener(self.invalidate)
+
+    @property
+    def store(self) -> ResultStore:
+        """Where the resolved styles are kept."""
+        return self._store
+
+    @property
+    def damage(self) -> List[Rect]:
+        """The screen areas whose contents changed during the latest
+        resolution, i.e. the old and new areas of every component whose
+        resolved style changed, and the areas of removed components.
+        """
+        return self._damage
 
-    def _lay_items(self, node: ComponentTreeNode, axis: Axis) -> None:
-        """Lays out the node's children one after another, in the directions of
-        the node's `layout_direction`, by modifying their positions. Final
-        sizes for components should be calculated before using this function to
-        to lay out components.
+    @property
+    def dirty(self) -> List[Component]:
+        """The components marked dirty by the latest resolution, i.e. those
+        whose resolved styles changed or were dropped, for renderers to paint
+        again. See `Renderer.render`."""
+        return self._dirty
 
-        Args:
-            node (ComponentTreeNode): The node to work on.
-        """
+    @staticmethod
+    def _get_rect(style: Style | ResolvedStyle) -> Rect:
+        return Rect(style.x, style.y, style.width, style.height)
 
-        pos_name = axis
-        size = "width" if axis == "x" else "height"
-        layout_dir = node.component.style.layout_direction
+    def invalidate(self, component: Component) -> None:
+        """Marks the style of `component` to be resolved again by the next
+        resolution. Called by the tree when the style, text or children of
+        the component change."""
+        self._invalid.add(component)
 
-        rl_pos_children: List[ComponentTreeNode] = [
-            child_node for child_node in node.children
-            if child_node.component.style.position == "relative"
-        ]
+    def _get_initial_values(self, layout: NodeLayout) -> Tuple[Unit, ...]:
+        """Resolves initial position and size values from strings to
+        numericals. These may not be the final values, they might be modified
+        e.g. by min- and max-widths and size restrictions by parent
+        components, in later phases.
 
-        # Place the components one after the other
-        start_pos = getattr(node.component.resolved_style, pos_name)
-        for child_node in rl_pos_children:
-            rstyle = child_node.component.resolved_style
+        Args:
+            layout (NodeLayout): The layout of the node to work on.
 
-            if layout_dir == axis:
-                setattr(rstyle, pos_name, start_pos)
-                start_pos += getattr(rstyle, size)
-            else:
-                setattr(rstyle,
-                        pos_name,
-                        getattr(node.component.resolved_style, pos_name))
+        Returns:
+            Tuple[Unit, ...]: The x, y, width and height.
+        """
+        node = layout.node
+        style = node.component.style
 
-    def _get_children_required_size(self, node: ComponentTreeNode, axis: Axis) -> int:
-        """Calculates the size(width/height) of the children of a given node,
-        in the given axis, take up. (currently just sum of their height/width,
-        i.e. size if they are stuck together with no spacing.)
+        # If root component, values are inherited from viewport.
+        if node.parent is None:
+            return (self._viewport.x,
+                    self._viewport.y,
+                    self._viewport.width,
+                    self._viewport.height)
+
+        parent = self._layouts[node.parent.component]
+        x, y, width, height = style.x, style.y, style.width, style.height
+
+        if x is not None:
+            x = Position.of(x).resolve(parent.initial_x, parent.initial_width)
+        if y is not None:
+            y = Position.of(y).resolve(parent.initial_y, parent.initial_height)
+        if width is not None:
+            width = Size.of(width).resolve(parent.initial_width)
+        if height is not None:
+            height = Size.of(height).resolve(parent.initial_height)
+
+        # Absolutely positioned components are placed at 0 by default.
+        if style.position == "absolute":
+            x = x or 0
+            y = y or 0
+
+        return x, y, width, height
+
+    def _get_children_required_size(self, layout: NodeLayout) -> Tuple[int, int]:
+        """Calculates the size(width and height) of the children of a given
+        node take up. (currently just sum of their height/width, i.e. size if
+        they are stuck together with no spacing.)
 
         Only count children using relative positioning
 
         Args:
-            node (ComponentTreeNode): The node whose children to calc.
-            axis (Axis): The axis for which to calculate the children's size.
+            layout (NodeLayout): The layout of the node whose children to calc.
 
         Returns:
-            (int): The sum of children's size in the direction of axis.
+            (Tuple[int, int]): The sums of children's adjusted sizes in the
+            direction of the layout, and their largest adjusted sizes in the
+            other direction.
         """
-        layout_dir = node.component.style.layout_direction
-        size_name = "width" if axis == "x" else "height"
+        layout_dir = layout.node.component.style.layout_direction
 
-        children_required_size = 0
-        for child_node in node.children:
-            if child_node.component.style.position != "relative":
+        required_width = 0
+        required_height = 0
+        for child_node in layout.children:
+            child = self._layouts[child_node.component]
+            if child.is_relative is not True:
                 continue
-            csz = getattr(child_node.component.resolved_style, size_name)
-            if layout_dir == axis:
-                children_required_size += csz
+
+            if layout_dir == "x":
+                required_width += child.adjusted_width
             else:
-                children_required_size = max(children_required_size, csz)
+                required_width = max(required_width, child.adjusted_width)
 
-        return children_required_size
+            if layout_dir == "y":
+                required_height += child.adjusted_height
+            else:
+                required_height = max(required_height, child.adjusted_height)
 
-    def _adjust_sizes(self, node: ComponentTreeNode, axis: Axis) -> None:
-        """Needs to be given nodes acquired by reverse traversal of the
-        component tree, i.e. from leaves to root / bottom to top so that for
-        every component their children are resolved before themselve.
+        return required_width, required_height
 
-        Uses the node's childrens' size values to adjust its own if it is set
-        to None (i.e. 'auto'). The node's size is also clamped to fit within
-        its min- and max-widths.
-
-        After this the children's sizes are adjusted to fit the restrictions
-        posed by their parent(this node). (This part maybe could/should be
-        separated into its own function)
+    @staticmethod
+    def _scales_children(fit: Tuple) -> bool:
+        """Whether the children of a node with the given adjusted and
+        required width and height are scaled down to fit within it."""
+        width, height, required_width, required_height = fit
+        if width is UNRESOLVED or required_width is UNRESOLVED:
+            return True
+        return required_width > width or required_height > height
 
-        Args:
-            node (ComponentTreeNode): The node to work on.
+    @staticmethod
+    def _adjust_size(size: int | None,
+                     min_size: int,
+                     max_size: int | None,
+                     children_required_size: int) -> int:
+        """Uses the childrens' required size as the size if it is None (i.e.
+        'auto'). The size is also clamped to fit within the min- and max-sizes.
         """
-        size_name = "width" if axis == "x" else "height"
-        min_size_name = "min_width" if axis == "x" else "min_height"
-        max_size_name = "max_width" if axis == "x" else "max_height"
-
-        children_required_size = self._get_children_required_size(node, axis)
-
-        rstyle = node.component.resolved_style
-        sz = getattr(rstyle, size_name)
-
-        if axis == "x":
-            s = getattr(rstyle, min_size_name)
-            min_size = s if s is not None else len(node.component.text)
-        else:
-            s = getattr(rstyle, min_size_name)
-            min_size = (s if s is not None else
-                        (1 if node.component.text else 0))
-
         # if size is given for node(i.e. not auto), clamp relative to it.
         # Otherwise get the base size from children's required size.
-        if sz is not None:
-            sz = clamp(min_size,
-                       sz,
-                       getattr(rstyle, max_size_name))
-        else:
-            sz = clamp(min_size,
-                       children_required_size,
-                       getattr(rstyle, max_size_name))
-
-        setattr(node.component.resolved_style, size_name, sz)
-        setattr(node.component.resolved_style, min_size_name, min_size)
-
-    def _fit_within_parent(self, node: ComponentTreeNode, axis: Axis):
-        # Restrict children's sizes to parent's size
-        # The children are scale down so that they retain their relative sizes
-        # to each other, i.e. a child with width 10 will be 2 times larger than
-        # a child with width 5. Min_widths are still respected, children will
-        # overflow if they cannot scale down enough.
-
-        size_name = "width" if axis == "x" else "height"
-        min_size_name = "min_width" if axis == "x" else "min_height"
-        max_size_name = "max_width" if axis == "x" else "max_height"
+        if size is not None:
+            return clamp(min_size, size, max_size)
+        return clamp(min_size, children_required_size, max_size)
 
-        children_required_size = self._get_children_required_size(node, axis)
-
-        avail_space = getattr(node.component.resolved_style, size_name)
-        if children_required_size > avail_space:
-            for child_node in node.children:
-                rs = child_node.component.resolved_style
-                cur_size = getattr(rs, size_name)
-                new_size = (avail_space/children_required_size) * cur_size
-                new_size = clamp(getattr(rs, min_size_name),
-                                 new_size, getattr(rs, max_size_name))
-                setattr(child_node.component.resolved_style,
-                        size_name,
-                        int(new_size))
-
-    def _resolve_abs_positions(self, node: ComponentTreeNode) -> None:
-        """Simply sets a component's positions(x,y) to 0 if they are not
-        defined and the object is using position="absolute".
-
-        Args:
-            node (ComponentTreeNode): The node to work on.
+    @staticmethod
+    def _fit_size(size: int,
+                  min_size: int,
+                  max_size: int | None,
+                  avail_space: int,
+                  children_required_size: int) -> int:
+        """Restricts a child's size to its parent's size.
+
+        The children are scale down so that they retain their relative sizes
+        to each other, i.e. a child with width 10 will be 2 times larger than
+        a child with width 5. Min_widths are still respected, children will
+        overflow if they cannot scale down enough.
         """
-        if node.component.style.position != "absolute":
-            return
-
-        rstyle = node.component.resolved_style
-        rstyle.x = rstyle.x or 0
-        rstyle.y = rstyle.y or 0
+        if children_required_size > avail_space:
+            new_size = (avail_space/children_required_size) * size
+            return int(clamp(min_size, new_size, max_size))
+        return size
 
-    def _resolve_relative_values(self, node: ComponentTreeNode, axis: Axis) -> None:
-        """Resolves initial size and position values from strings to numericals.
-        These may not be the final values, they might be modified e.g. by min-
-        and max-widths and size restrictions by parent components, in later
-        phases.
+    def _lay_items(self, layout: NodeLayout, axis: Axis) -> List[Component]:
+        """Lays out the node's children one after another, in the directions of
+        the node's `layout_direction`, by modifying their positions. Final
+        sizes for components should be calculated before using this function to
+        to lay out components.
 
         Args:
-            node (ComponentTreeNode): The node to work on.
-        """
-        # NOTE: perfomance could be optimized, function could be be ran only
-        # for nodes whose parents have changed size or position.
+            layout (NodeLayout): The layout of the node to work on.
+            axis (Axis): The axis in which to lay out the children.
 
+        Returns:
+            List[Component]: The children whose positions changed.
+        """
         pos_name = axis
         size_name = "width" if axis == "x" else "height"
+        layout_dir = layout.node.component.style.layout_direction
 
-        style = node.component.resolved_style
+        moved = []
 
-        # If root component, values are inherited from viewport.
-        if node.parent is None:
-            new_style = replace(style,
-                                x=self._viewport.x,
-                                y=self._viewport.y,
-                                width=self._viewport.width,
-                                height=self._viewport.height)
+        # Place the components one after the other
+        start_pos = getattr(layout, pos_name)
+        for child_node in layout.children:
+            child = self._layouts[child_node.component]
+            if child.is_relative is not True:
+                continue
+
+            if layout_dir == axis:
+                pos = start_pos
+                start_pos += getattr(child, size_name)
+            else:
+                pos = getattr(layout, pos_name)
+
+            if getattr(child, pos_name) != pos:
+                setattr(child, pos_name, pos)
+                moved.append(child_node.component)
+
+        return moved
+
+    def _add_layouts(self,
+                     node: ComponentTreeNode,
+                     depth: int,
+                     invalid: Set[Component]) -> None:
+        """Creates layouts for the components in the subtree of `node`, and
+        marks them invalid."""
+        stack = [(node, depth)]
+        while stack:
+            node, depth = stack.pop()
+            self._layouts[node.component] = NodeLayout(node, depth)
+            invalid.add(node.component)
+            stack.extend((child, depth + 1) for child in node.children)
+
+    def _drop_layouts(self, node: ComponentTreeNode) -> None:
+        """Drops the layouts of the components in the subtree of `node`, a
+        node removed from the tree. Components added back to the tree since
+        have new nodes, and their layouts are kept."""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            layout = self._layouts.get(node.component)
+            if layout is None or layout.node is not node:
+                continue
+            del self._layouts[node.component]
+            self._deferred.discard(node.component)
+            stack.extend(layout.children)
+
+            style = self._store.get_resolved_style(node.component)
+            if style is not None:
+                self._removed_rects.append(self._get_rect(style))
+
+    def _damage_subtree(self, node: ComponentTreeNode) -> None:
+        """Damages the areas of the components in the subtree of `node`,
+        e.g. when the subtree is moved in front of or behind others without
+        changing areas, so that it is drawn again in its new order."""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            style = self._store.get_resolved_style(node.component)
+            if style is not None:
+                self._removed_rects.append(self._get_rect(style))
+            stack.extend(node.children)
+
+    def _damage_reordered(self,
+                          previous: List[ComponentTreeNode],
+                          children: List[ComponentTreeNode]) -> None:
+        """Damages the subtrees of the children kept from `previous` whose
+        order relative to each other has changed in `children`."""
+        kept = set(previous).intersection(children)
+        for before, after in zip((c for c in previous if c in kept),
+                                 (c for c in children if c in kept)):
+            if before is not after:
+                self._damage_subtree(after)
+
+    @staticmethod
+    def _get_layout_key(component: Component) -> Tuple:
+        """Returns the values of a component its layout is resolved from,
+        besides those of its parent and children."""
+        style = component.style
+        return (style.position,
+                style.x, style.y,
+                style.width, style.height,
+                style.min_width, style.min_height,
+                style.max_width, style.max_height,
+                style.layout_direction,
+                len(component.text))
+
+    def _collect_invalid(self) -> Tuple[Set[Component], Set[Component]]:
+        """Finds the components whose styles need to be resolved: the ones
+        invalidated since the previous resolution and the components added
+        to the tree. The layouts of components removed from the tree are
+        dropped.
 
-            node.component.resolved_style = new_style
-            return
+        Returns:
+            Tuple[Set[Component], Set[Component]]: The components whose
+            styles need to be resolved, and of those the components whose
+            layouts need to be resolved, i.e. whose layout keys or children
+            have changed, and the root if the viewport has changed.
+        """
+        invalid, self._invalid = self._invalid, set()
+        # Components whose layouts are resolved regardless of their keys.
+        changed = set()
+
+        root = self._tree.root
+        if root.component not in self._layouts:
+            self._layouts.clear()
+            self._add_layouts(root, 0, invalid)
+
+        viewport = (self._viewport.x,
+                    self._viewport.y,
+                    self._viewport.width,
+                    self._viewport.height)
+        if viewport != self._resolved_viewport:
+            self._resolved_viewport = viewport
+            invalid.add(root.component)
+            changed.add(root.component)
+
+        # Invalidated components may have had children added or removed.
+        # Removed children are dropped before added ones are added, so that
+        # a child moved from one parent to another keeps its layouts.
+        restructured = [layout for layout in map(self._layouts.get, invalid)
+                        if layout is not None
+                        and layout.children != layout.node.children]
+
+        for layout in restructured:
+            children = set(layout.node.children)
+            for child in layout.children:
+                if child not in children:
+                    self._drop_layouts(child)
+
+        for layout in restructured:
+            component = layout.node.component
+            if self._layouts.get(component) is not layout:
+                continue
 
-        parent_style = node.parent.component.resolved_style
+            previous_children = set(layout.children)
+            for child in layout.node.children:
+                if child not in previous_children:
+                    self._add_layouts(child, layout.depth + 1, invalid)
 
-        cur_pos = getattr(style, pos_name)
-        cur_size = getattr(style, size_name)
-        parent_pos = getattr(parent_style, pos_name)
-        parent_size = getattr(parent_style, size_name)
+            # Children moved from other parents had their areas damaged when
+            # their layouts were dropped, see `_drop_layouts`.
+            self._damage_reordered(layout.children, layout.node.children)
+            layout.children = list(layout.node.children)
+            changed.add(component)
 
-        if cur_pos is not None:
-            new_pos = Position(cur_pos).resolve(parent_pos, parent_size)
-            setattr(style, pos_name, new_pos)
+        # Components removed from the tree may have been invalidated.
+        invalid = {c for c in invalid if c in self._layouts}
 
-        if cur_size is not None:
-            new_size = Size(cur_size).resolve(parent_size)
-            setattr(style, size_name, new_size)
+        # A layout resolved with the same values as before would not change,
+        # e.g. when only the colors of a style change.
+        layout_invalid = set()
+        for component in invalid:
+            layout = self._layouts[component]
+            key = self._get_layout_key(component)
+            if key != layout.layout_key or component in changed:
+                layout.layout_key = key
+                layout_invalid.add(component)
 
-    def _set_resolved_style(self, node: ComponentTreeNode):
-        res_style = copy(node.component.style)
-        node.component.resolved_style = res_style
+        return invalid, layout_invalid
 
     # Parts of the resolution pipeline.
     # Need to be split into separate passes as direction of tree
-    # traversal must change.
+    # traversal must change. Every pass visits only the nodes whose values
+    # may have changed, and tells the following passes which nodes to visit.
 
-    def _first_pass(self) -> None:
+    def _first_pass(self,
+                    invalid: Set[Component],
+                    resolution: _Resolution) -> None:
         """Sets initial values for e.g. sizes and positions with percentage
         values. These are further modified (e.g. confined to size restrictions
-        etc.) by subsequent passes.
+        etc.) by subsequent passes. The values of the invalid nodes are set,
+        and the values of the descendants of nodes whose values changed.
         """
-        for node in self._tree.traverse():
-            self._set_resolved_style(node)
-            self._resolve_relative_values(node, "x")
-            self._resolve_relative_values(node, "y")
-            self._resolve_abs_positions(node)
-
-    def _second_pass(self) -> None:
+        queue = DepthQueue(self._layouts)
+        for component in invalid:
+            queue.add(component)
+
+        for component in queue:
+            layout = self._layouts[component]
+            values = self._get_initial_values(layout)
+            if values != (layout.initial_x,
+                          layout.initial_y,
+                          layout.initial_width,
+                          layout.initial_height):
+                if values[2:] != (layout.initial_width, layout.initial_height):
+                    resolution.adjust.add(component)
+                (layout.initial_x,
+                 layout.initial_y,
+                 layout.initial_width,
+                 layout.initial_height) = values
+                for child_node in layout.children:
+                    queue.add(child_node.component)
+
+            # Only relatively positioned components are laid out by their
+            # parents.
+            if (layout.node.parent is None
+                    or component.style.position != "relative"):
+                position = (layout.initial_x, layout.initial_y)
+                if position != (layout.x, layout.y):
+                    layout.x, layout.y = position
+                    resolution.changed.add(component)
+                    resolution.relayout.add(component)
+
+    def _second_pass(self, resolution: _Resolution) -> None:
         """Does more adjustments on initial sizes assigned by first_pass.
-        Nodes must be traverses from leaves to root / bottom to top.
-        """
-        for node in self._tree.traverse(reverse=True):
-            self._adjust_sizes(node, "x")
-            self._adjust_sizes(node, "y")
-            self._fit_within_parent(node, "x")
-            self._fit_within_parent(node, "y")
+        Nodes must be traverses from leaves to root / bottom to top, so that
+        for every node their children are adjusted before themselves.
 
-    def _third_pass(self) -> None:
+        Uses the node's childrens' size values to adjust its own if it is set
+        to None (i.e. 'auto'). The node's size is also clamped to fit within
+        its min- and max-widths.
+        """
+        queue = DepthQueue(self._layouts, deepest_first=True)
+        for component in resolution.adjust:
+            queue.add(component)
+
+        for component in queue:
+            layout = self._layouts[component]
+            style = component.style
+            parent_node = layout.node.parent
+
+            old_fit = (layout.adjusted_width, layout.adjusted_height,
+                       layout.required_width, layout.required_height)
+
+            required_size = self._get_children_required_size(layout)
+            layout.required_width, layout.required_height = required_size
+
+            text = component.text
+            min_size = (style.min_width if style.min_width is not None
+                        else len(text),
+                        style.min_height if style.min_height is not None
+                        else (1 if text else 0))
+            adjusted_size = (
+                self._adjust_size(layout.initial_width, min_size[0],
+                                  style.max_width, required_size[0]),
+                self._adjust_size(layout.initial_height, min_size[1],
+                                  style.max_height, required_size[1])
+            )
+            if (adjusted_size != (layout.adjusted_width, layout.adjusted_height)
+                    or min_size != (layout.min_width, layout.min_height)):
+                layout.adjusted_width, layout.adjusted_height = adjusted_size
+                layout.min_width, layout.min_height = min_size
+                resolution.changed.add(component)
+                resolution.resize.add(component)
+                # The parent's required size depends on the adjusted size.
+                if parent_node is not None and layout.is_relative is True:
+                    queue.add(parent_node.component)
+
+            # Children not scaled down to fit, before or after, keep their
+            # adjusted sizes, and need not be fitted again.
+            new_fit = adjusted_size + required_size
+            if new_fit != old_fit and (self._scales_children(old_fit)
+                                       or self._scales_children(new_fit)):
+                resolution.refit.add(component)
+
+            is_relative = style.position == "relative"
+            if is_relative != layout.is_relative:
+                layout.is_relative = is_relative
+                if parent_node is not None:
+                    queue.add(parent_node.component)
+                    resolution.relayout.add(parent_node.component)
+
+    def _fit_sizes(self, resolution: _Resolution) -> None:
+        """Sets the final sizes of nodes by restricting their adjusted sizes
+        to their parents' sizes."""
+        resize = resolution.resize
+        for component in resolution.refit:
+            resize.update(child_node.component
+                          for child_node in self._layouts[component].children)
+
+        for component in resize:
+            layout = self._layouts[component]
+            parent_node = layout.node.parent
+
+            if parent_node is None:
+                size = (layout.adjusted_width, layout.adjusted_height)
+            else:
+                parent = self._layouts[parent_node.component]
+                style = component.style
+                size = (
+                    self._fit_size(layout.adjusted_width,
+                                   layout.min_width,
+                                   style.max_width,
+                                   parent.adjusted_width,
+                                   parent.required_width),
+                    self._fit_size(layout.adjusted_height,
+                                   layout.min_height,
+                                   style.max_height,
+                                   parent.adjusted_height,
+                                   parent.required_height)
+                )
+
+            if size != (layout.width, layout.height):
+                layout.width, layout.height = size
+                resolution.changed.add(component)
+                # Changing size moves the siblings laid out after the node.
+                if parent_node is not None and layout.is_relative is True:
+                    resolution.relayout.add(parent_node.component)
+
+    def _third_pass(self, resolution: _Resolution) -> None:
         """The second pass adjusts sizes, this pass adjusts positions. Having
         the final sizes calculated, does things like laying out the components
-        along their parent's `layout_axis` one after another.
+        along their parent's `layout_axis` one after another. Nodes whose
+        children were moved are laid out in turn.
         """
-        for node in self._tree.traverse():
-            self._lay_items(node, "x")
-            self._lay_items(node, "y")
+        queue = resolution.relayout
+        for component in queue:
+            layout = self._layouts[component]
+            for axis in ("x", "y"):
+                for moved in self._lay_items(layout, axis):
+                    resolution.changed.add(moved)
+                    queue.add(moved)
+
+    def _set_resolved_style(self,
+                            component: Component,
+                            x: Unit,
+                            y: Unit,
+                            width: Unit,
+                            height: Unit,
+                            min_width: Unit,
+                            min_height: Unit) -> None:
+        """Updates the resolved style of `component` in place. Its area,
+        version and text before the first update of a resolution are kept for
+        `flag_dirty_components`.
+
+        When culling, components out of view, before and after the update,
+        are left out of date until they come into view, see
+        `_update_deferred`. Their resolved styles are dropped meanwhile, as
+        their old areas could come into view before they do, e.g. when the
+        viewport grows, and show them where they no longer are.
+        """
+        resolved = self._store.get_resolved_style(component)
+        # The root is always resolved, as it gives the size of the screen.
+        if (self._cull and not self._is_visible(x, y, width, height)
+                and component is not self._tree.root.component):
+            if resolved is None or not self._is_visible(resolved.x,
+                                                         resolved.y,
+                                                         resolved.width,
+                                                         resolved.height):
+                self._deferred.add(component)
+                if resolved is not None:
+                    self._drop_resolved_style(component, resolved)
+                return
+        self._deferred.discard(component)
+
+        if resolved is None:
+            resolved = ResolvedStyle(component.style, component.text)
+            self._store.set_resolved_style(component, resolved)
+            self._resolved[component] = None
+        elif component not in self._resolved:
+            self._resolved[component] = (self._get_rect(resolved),
+                                         resolved.version,
+                                         resolved.text)
+
+        resolved.update(component.style, component.text,
+                        x, y, width, height, min_width, min_height)
+
+    def _drop_resolved_style(self,
+                             component: Component,
+                             resolved: ResolvedStyle) -> None:
+        """Drops the resolved style of a deferred component, damaging the
+        areas it had before and during the resolution. The component is
+        marked dirty, so that renderers drop what they kept for it."""
+        before = self._resolved.pop(component, None)
+        if before is not None:
+            self._removed_rects.append(before[0])
+        self._removed_rects.append(self._get_rect(resolved))
+        self._store.set_resolved_style(component, None)
+        self._store.set_dirty(component, True)
+        self._dirty.append(component)
+
+    def _is_visible(self, x: Unit, y: Unit, width: Unit, height: Unit) -> bool:
+        if x is None or y is None or width is None or height is None:
+            return True
+        # Same as `Rect.intersects`, without creating a rect for every node.
+        visible = self._visible
+        return (x < visible.right and visible.x < x + width
+                and y < visible.bottom and visible.y < y + height)
+
+    def _get_layout_values(self, component: Component) -> Tuple | None:
+        """Returns the values last resolved for `component`, as passed to
+        `_set_resolved_style`, or None if it is not in the tree."""
+        layout = self._layouts.get(component)
+        if layout is None:
+            return None
+        return (layout.x, layout.y,
+                layout.width, layout.height,
+                layout.min_width, layout.min_height)
+
+    def _update_deferred(self) -> None:
+        """Updates the resolved styles of the deferred components that have
+        come into view."""
+        for component in list(self._deferred):
+            values = self._get_layout_values(component)
+            if values is None:
+                self._deferred.discard(component)
+            elif self._is_visible(*values[:4]):
+                self._set_resolved_style(component, *values)
+
+    def _begin_changes(self) -> bool:
+        """Starts recording the changes of a resolution, see
+        `flag_dirty_components`. Returns whether the viewport changed since
+        the latest resolution."""
+        self._resolved = {}
+        self._removed_rects = []
+        self._dirty = []
+        viewport = self._viewport
+        visible = Rect(viewport.x, viewport.y,
+                       viewport.width, viewport.height)
+        viewport_changed = visible != self._visible
+        self._visible = visible
+        return viewport_changed
+
+    def _end_changes(self, viewport_changed: bool) -> None:
+        """Marks the components changed by a resolution as dirty, and records
+        the damage, see `flag_dirty_components`. Deferred components are
+        updated first if the viewport changed."""
+        if viewport_changed and self._deferred:
+            self._update_deferred()
+
+        # Components no longer in the tree leave their area damaged.
+        damage = self._removed_rects
+        store = self._store
+        for component, before in self._resolved.items():
+            after = store.get_resolved_style(component)
+            rect = self._get_rect(after)
+
+            if before is None:
+                store.set_dirty(component, True)
+            else:
+                before_rect, before_version, before_text = before
+                if (before_rect != rect
+                        or before_version != after.version
+                        or before_text != after.text):
+                    store.set_dirty(component, True)
+
+            if store.is_dirty(component):
+                if before is not None:
+                    damage.append(before_rect)
+                damage.append(rect)
+                self._dirty.append(component)
+
+        self._damage = damage
 
     @staticmethod
     def flag_dirty_components(
         func: Callable[[StyleResolver, *T], A]
     ) -> Callable[[StyleResolver, *T], A]:
-        """A decorator for comparing the state of all components'
-        `resolved_style`s to their `prev_resolved_style`s. Marks a component
-        as dirty if changes have occured. This decorator also handles
-        updating the `prev_resolved_style`s for these components
+        """A decorator for comparing the state of the resolved components'
+        `resolved_style`s to their state before `func`, see
+        `_set_resolved_style`. Marks a component as dirty if it has moved or
+        resized, or if its style or text has changed, and records the
+        component's old and new areas as damaged.
+
+        Changes to styles are found by their versions, see `Style.version`,
+        so that styles need not be compared value by value. Deferred
+        components coming into view, e.g. as the viewport grows, are updated
+        as well.
 
         Args:
             func (Callable[[StyleResolver, T], A]): The function during
@@ -267,20 +713,10 @@ class StyleResolver:
         """
         @wraps(func)
         def wrapper(self: Self, *args: T, **kwargs: T) -> A:
+            # pylint: disable=protected-access
+            viewport_changed = self._begin_changes()
             return_value = func(self, *args, **kwargs)
-
-            for node in self._tree.traverse():
-                before = node.component.prev_resolved_style
-                after = node.component.resolved_style
-
-                if not before or not after:
-                    node.component.dirty = True
-
-                elif before != after:
-                    node.component.dirty = True
-
-                node.component.prev_resolved_style = after
-
+            self._end_changes(viewport_changed)
             return return_value
 
         return wrapper
@@ -289,11 +725,37 @@ class StyleResolver:
     def _resolution_pipeline(self) -> None:
         """Wraps together all the steps for resolving styles for all nodes'
         components in `self._tree`(ComponentNodeTree). When finished, all
-        components have their resolved styles set in their `resolved_style`.
+        components have their resolved styles set in `self._store`.
+        Only the styles of invalidated components, and of components whose
+        layout depends on them, are resolved again.
         """
-        self._first_pass()
-        self._second_pass()
-        self._third_pass()
+        invalid, layout_invalid = self._collect_invalid()
+        resolution = _Resolution(self._layouts)
+        # Nodes whose style changed have their resolved styles updated.
+        # Those whose layout keys changed have their adjusted sizes, final
+        # sizes and children's positions recomputed as well.
+        resolution.changed.update(invalid)
+        resolution.adjust.update(layout_invalid)
+        resolution.resize.update(layout_invalid)
+        for component in layout_invalid:
+            resolution.relayout.add(component)
+
+        self._first_pass(layout_invalid, resolution)
+        self._second_pass(resolution)
+        self._fit_sizes(resolution)
+        self._third_pass(resolution)
+
+        for component in resolution.changed:
+            layout = self._layouts[component]
+            self._set_resolved_style(component,
+                                     layout.x, layout.y,
+                                     layout.width, layout.height,
+                                     layout.min_width, layout.min_height)
+
+    def close(self) -> None:
+        """Stops following the changes to the tree. The resolver is not used
+        after this."""
+        self._tree.remove_invalidation_listener(self.invalidate)
 
     def resolve(self) -> None:
         """Resolve the styles for all components in tree.
@@ -1,8 +1,15 @@
+from __future__ import annotations
 from abc import ABC
+from functools import lru_cache
 from typing import Union, Literal
 
 Axis = Literal["x", "Y"]
 
+# How many distinct unit values are kept parsed, see `Position.of` and
+# `Size.of`. Styles use few distinct values, but values computed at run time,
+# e.g. for animations, would otherwise be kept forever.
+_MAX_INTERNED = 1024
+
 
 class Unit(ABC):
     def __init__(self, value: Union[int, float, str]) -> None:
@@ -38,27 +45,88 @@ class Unit(ABC):
 
 
 class Position(Unit):
-    def resolve(self, reference_pos: int, reference_size: int) -> int:
-        if not isinstance(self._value, str):
-            return int(reference_pos + self._value)
-
-        if self._value.endswith("%"):
-            percentage = self._parse_percentage(self._value)
-            return int(reference_pos + reference_size * percentage)
+    def __init__(self, value: Union[int, float, str]) -> None:
+        super().__init__(value)
+
+        # Strings are parsed once, so that resolving is arithmetic only.
+        self._is_fraction = isinstance(value, str) and value.endswith("%")
+        if self._is_fraction:
+            self._number = self._parse_percentage(value)
+        elif isinstance(value, str):
+            self._number = self._parse_number_str(value)
+        else:
+            self._number = value
+
+    @classmethod
+    @lru_cache(maxsize=_MAX_INTERNED)
+    def of(cls, value: Union[int, float, str]) -> Position:
+        """Returns the position of `value`, shared by all users of the same
+        value, so that a value in use is parsed only once. The most recently
+        used values are kept."""
+        return cls(value)
+
+    @property
+    def number(self) -> int | float:
+        """The parsed value: a fraction of the reference size if
+        `is_fraction`, otherwise an offset from the reference position."""
+        return self._number
+
+    @property
+    def is_fraction(self) -> bool:
+        return self._is_fraction
 
-        return int(reference_pos + self._parse_number_str(self._value))
+    def resolve(self, reference_pos: int, reference_size: int) -> int:
+        if self._is_fraction:
+            return int(reference_pos + reference_size * self._number)
+        return int(reference_pos + self._number)
 
 
 class Size(Unit):
+    def __init__(self, value: Union[int, float, str]) -> None:
+        super().__init__(value)
+
+        # Strings are parsed once, so that resolving is arithmetic only.
+        self._is_str = isinstance(value, str)
+        self._is_fraction = self._is_str and value.endswith("%")
+        if self._is_fraction:
+            self._number = self._parse_percentage(value)
+        elif self._is_str:
+            self._number = self._parse_number_str(value)
+        else:
+            self._number = value
+
+    @classmethod
+    @lru_cache(maxsize=_MAX_INTERNED)
+    def of(cls, value: Union[int, float, str]) -> Size:
+        """Returns the size of `value`, shared by all users of the same
+        value, so that a value in use is parsed only once. The most recently
+        used values are kept."""
+        return cls(value)
+
+    @property
+    def number(self) -> int | float:
+        """The parsed value: a fraction of the parent's size if
+        `is_fraction`, otherwise the size."""
+        return self._number
+
+    @property
+    def is_fraction(self) -> bool:
+        return self._is_fraction
+
+    @property
+    def is_str(self) -> bool:
+        """Whether the size was given as a string. These resolve to 0 when
+        the parent has no size."""
+        return self._is_str
+
     def resolve(self, parent_size: int) -> int:
-        if not isinstance(self._value, str):
-            return int(self._value)
+        if not self._is_str:
+            return int(self._number)
 
         if not parent_size:
             return 0
 
-        if self._value.endswith("%"):
-            percentage = self._parse_percentage(self._value)
-            return int(parent_size * percentage)
+        if self._is_fraction:
+            return int(parent_size * self._number)
 
-        return int(self._parse_number_str(self._value))
+        return int(self._number)
@@ -7,10 +7,15 @@ from .style_resolver.style_resolver import StyleResolver
 from .viewport import Viewport
 from .rendering.renderer import Renderer
 from .focus_manager import FocusManager
+from .frame_scheduler import FrameScheduler
 
 
 class Window:
-    def __init__(self, renderer: Renderer, viewport: Viewport, t: Terminal) -> None:
+    def __init__(self,
+                 renderer: Renderer,
+                 viewport: Viewport,
+                 t: Terminal,
+                 max_fps: float = 60) -> None:
         self._viewport = viewport
         self._component_tree = ComponentTree()
         self._event_queue = EventQueue()
@@ -18,6 +23,14 @@ class Window:
         self._renderer = renderer
         self._style_resolver = StyleResolver(self._component_tree,
                                              self._viewport)
+        # UPDATE events only request a frame, the frames are drawn by the
+        # scheduler.
+        self._frame_scheduler = FrameScheduler(self._update_screen, max_fps)
+        # So do changes to the components, e.g. rows scrolled into view.
+        self._component_tree.add_invalidation_listener(
+            lambda _: self._frame_scheduler.request_frame()
+        )
+        self._component_tree.add_unmount_listener(self._renderer.forget)
 
         self._is_running = False
 
@@ -46,16 +59,18 @@ class Window:
             [EventType.KEY_PRESS], self._handle_key_event
         )
         screen_update_listener = EventListener(
-            [EventType.UPDATE], self._update_screen
+            [EventType.UPDATE], lambda _: self._frame_scheduler.request_frame()
         )
         self._event_queue.add_event_listener(key_event_listener)
         self._event_queue.add_event_listener(screen_update_listener)
 
-    def _update_screen(self, _event: Event):
+    def _update_screen(self):
         self._viewport.width, self._viewport.height = self._t.width, self._t.height
 
         self._style_resolver.resolve()
-        self._renderer.render(self._component_tree)
+        self._renderer.render(self._component_tree,
+                              self._style_resolver.damage,
+                              dirty=self._style_resolver.dirty)
         self._renderer.draw()
 
     def _handle_key_event(self, event: Event):
@@ -65,36 +80,44 @@ class Window:
 
         if func is not None:
             func()
-
-        # This event is handled the next time events are processed.
-        # This is also why in `run` events are processed twice.
-        self._event_queue.enqueue_event(Event(EventType.UPDATE))
+        # No frame is requested here. Keys that change what is shown, e.g. by
+        # moving focus, invalidate components, which requests a frame.
 
     def run(self):
         with self._t.fullscreen(), self._t.cbreak(), self._t.hidden_cursor():
             self._event_queue.enqueue_event(Event(EventType.UPDATE))
 
             self._is_running = True
-            while self._is_running:
-                key = self._t.inkey(0.02)
-                key = str(key.name) if key.is_sequence else str(key)
-
-                if key:
-                    key_event = Event(EventType.KEY_PRESS, {"key": key})
-                    self._event_queue.enqueue_event(key_event)
-
-                    f = self._focus_manager.focused_component
-                    if f is not None:
-                        f.enqueue_event(key_event)
-
-                if self._viewport.width != self._t.width or self._viewport.height != self._t.height:
-                    self._event_queue.enqueue_event(Event(EventType.UPDATE))
-                    self._viewport.width, self._viewport.height = self._t.width, self._t.height
-
-                self._event_queue.process_events()
-                for c in self._component_tree.traverse():
-                    c.component.process_events()
-                self._event_queue.process_events()
+            try:
+                self._loop()
+            finally:
+                self._renderer.close()
+
+    def _loop(self):
+        while self._is_running:
+            # Wake up in time for a requested frame.
+            timeout = self._frame_scheduler.time_until_frame()
+            key = self._t.inkey(0.02 if timeout is None else min(timeout, 0.02))
+            key = str(key.name) if key.is_sequence else str(key)
+
+            if key:
+                key_event = Event(EventType.KEY_PRESS, {"key": key})
+                self._event_queue.enqueue_event(key_event)
+
+                f = self._focus_manager.focused_component
+                if f is not None:
+                    f.enqueue_event(key_event)
+
+            if self._viewport.width != self._t.width or self._viewport.height != self._t.height:
+                self._event_queue.enqueue_event(Event(EventType.UPDATE))
+                self._viewport.width, self._viewport.height = self._t.width, self._t.height
+
+            self._event_queue.process_events()
+            for c in self._component_tree.traverse_components():
+                c.process_events()
+            self._event_queue.process_events()
+
+            self._frame_scheduler.tick()
 
     @property
     def component_tree(self):
@@ -0,0 +1,75 @@
+from json import dumps
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from tui.color import RGBA
+from tui.components.component import Component
+from tui.components.component_style import Style
+from tui.components.component_tree import ComponentTree
+from tui.components.examples.button import Button
+from tui.components.ui_file import load_ui
+
+PANELS = 50
+ROWS = 200
+COLORS = [[100, 140, 255, 1], [155, 255, 100, 1], [255, 100, 100, 1]]
+
+
+def build() -> ComponentTree:
+    """Builds a dashboard of 50 panels of 200 Buttons imperatively."""
+    tree = ComponentTree()
+    for i in range(PANELS):
+        tree.add_component(Component(cid=f"panel{i}",
+                                     style=Style(width="2%",
+                                                 height="100%",
+                                                 layout_direction="y")))
+        for j in range(ROWS):
+            tree.add_component(
+                Button(cid=f"panel{i}row{j}", text=f"{j}",
+                       style=Style(width="100%", height=1, max_width=20,
+                                   background_color=RGBA(*COLORS[j % 3]),
+                                   color=RGBA(163, 205, 255, 1))),
+                f"panel{i}"
+            )
+    return tree
+
+
+def write_ui(path: Path) -> None:
+    """Writes the same dashboard as a UI file."""
+    styles = {
+        f"row{k}": {"width": "100%", "height": 1, "max_width": 20,
+                    "background_color": color,
+                    "color": [163, 205, 255, 1]}
+        for k, color in enumerate(COLORS)
+    }
+    components = [
+        {"cid": f"panel{i}",
+         "style": {"width": "2%", "height": "100%", "layout_direction": "y"},
+         "children": [{"type": "Button", "cid": f"panel{i}row{j}",
+                       "text": f"{j}", "style": f"row{j % 3}"}
+                      for j in range(ROWS)]}
+        for i in range(PANELS)
+    ]
+    path.write_text(dumps({"styles": styles, "components": components}))
+
+
+def time_ms(func) -> float:
+    s = perf_counter()
+    func()
+    return (perf_counter() - s) * 1000
+
+
+def main():
+    print(f"timing {PANELS * (ROWS + 1)} components...")
+    print(f"imperative: {time_ms(build):.1f} ms")
+    with TemporaryDirectory() as directory:
+        path = Path(directory) / "dashboard.json"
+        write_ui(path)
+        cold = time_ms(lambda: load_ui(path, ComponentTree()))
+        warm = time_ms(lambda: load_ui(path, ComponentTree()))
+        print(f"UI file, compiled: {cold:.1f} ms")
+        print(f"UI file, cached: {warm:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()